@@ -3,22 +3,86 @@
 import os
 from datetime import datetime
 from sqlalchemy import (
-    create_engine, String, Text, DateTime, ForeignKey, Integer
+    create_engine, event, String, Text, DateTime, ForeignKey, Integer, Index
 )
 from sqlalchemy.orm import (
     declarative_base, sessionmaker, scoped_session,
     relationship, Mapped, mapped_column
 )
+from sqlalchemy.pool import QueuePool, StaticPool
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./research_app.db")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+
+
+def _engine_pool_kwargs(url: str) -> dict:
+    """
+    Pool config per backend. Connections (and the pragmas run on connect)
+    are reused across requests instead of being reopened each time.
+    """
+    if url.startswith("sqlite"):
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # in-memory DB only exists on its one connection
+            return {"poolclass": StaticPool}
+        # file DB: keep a pool of open handles; a single shared connection
+        # would mix transactions from concurrent requests
+        return {
+            "poolclass": QueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+        }
+    return {
+        "poolclass": QueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": False,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    }
+
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
     if DATABASE_URL.startswith("sqlite")
     else {},
+    **_engine_pool_kwargs(DATABASE_URL),
 )
 
+
+# ============================================================
+# SQLITE PRAGMAS — WAL so readers don't block on the writer
+# ============================================================
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+if DATABASE_URL.startswith("sqlite"):
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "close")
+    def _optimize_sqlite(dbapi_connection, connection_record):
+        try:
+            dbapi_connection.execute("PRAGMA optimize")
+        except Exception:
+            pass
+
 SessionLocal = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=engine)
 )
@@ -36,7 +100,8 @@ class Document(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # full document text can be megabytes; only load it when accessed
+    content: Mapped[str] = mapped_column(Text, nullable=False, deferred=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
@@ -49,9 +114,15 @@ class Document(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # "jobs for a document, newest first" style lookups
+        Index("ix_jobs_doc_created", "document_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    document_id: Mapped[int] = mapped_column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("documents.id"), nullable=False, index=True
+    )
 
     task_type: Mapped[str] = mapped_column(String(50), nullable=False)
     output_format: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -1,14 +1,27 @@
+import io
 import os
+import re
+import asyncio
+import errno
+import functools
+import hashlib
+import secrets
 from typing import List, Optional, Tuple, Literal
 from pathlib import Path
 from pypdf import PdfReader
+try:
+    # PyMuPDF (C/MuPDF core) is much faster than pypdf; optional so plain installs still work
+    import pymupdf as fitz
+except ImportError:
+    fitz = None
 from docx import Document as DocxDocument
-from jinja2 import Template
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from jinja2 import Environment
 from dotenv import load_dotenv
 import httpx
 import shutil
 import subprocess
-import requests
 
 load_dotenv()
 
@@ -20,14 +33,91 @@ for d in (UPLOAD_DIR, OUTPUT_DIR):
 
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY", "")
 
+# poppler CLI tools (optional); resolved once at import
+PDFTOTEXT_PATH = shutil.which("pdftotext")
+PDFINFO_PATH = shutil.which("pdfinfo")
+PDFTOTEXT_TIMEOUT_SECONDS = float(os.getenv("PDFTOTEXT_TIMEOUT_SECONDS", "60"))
+
+# LaTeX engines, also resolved once at import
+TECTONIC_PATH = shutil.which("tectonic")
+PDFLATEX_PATH = shutil.which("pdflatex")
+
+# compiled-PDF cache (cache_*.pdf in OUTPUT_DIR); least recently used beyond this are deleted
+PDF_CACHE_MAX_FILES = int(os.getenv("PDF_CACHE_MAX_FILES", "256"))
+
 # ============================================================
 # UTIL: EXTRACT TEXT FROM PDF/DOCX
 # ============================================================
 
-def extract_text_from_pdf(path: Path) -> Tuple[str, str]:
-    """Return (title, text)."""
+def _join_pages(page_texts) -> Tuple[str, str]:
+    """
+    Stream page texts into one buffer, newline-separated.
+    Returns (first_page_text, full_text); only the first page is kept around
+    for the title heuristic, so no list of all pages is retained.
+    """
+    buf = io.StringIO()
+    first_page_text = ""
+    for i, page_text in enumerate(page_texts):
+        if i == 0:
+            first_page_text = page_text
+        else:
+            buf.write("\n")
+        buf.write(page_text)
+    return first_page_text, buf.getvalue()
+
+
+def _title_from_text(first_page_text: str, path: Path) -> str:
+    # crude heuristic: first non-empty line of first page, else the file stem
+    for line in first_page_text.splitlines():
+        if line.strip():
+            return line.strip()[:200]
+    return path.stem
+
+
+def _extract_text_from_pdf_pymupdf(path: Path) -> Tuple[str, str]:
+    doc = fitz.open(str(path))
+    try:
+        title = ((doc.metadata or {}).get("title") or "").strip()
+        first_page_text, full_text = _join_pages(page.get_text("text") for page in doc)
+    finally:
+        doc.close()
+
+    if not title:
+        title = _title_from_text(first_page_text, path)
+    return title, full_text
+
+
+def _pdfinfo_title(path: Path) -> str:
+    if not PDFINFO_PATH:
+        return ""
+    try:
+        proc = subprocess.run(
+            [PDFINFO_PATH, "-enc", "UTF-8", str(path)],
+            capture_output=True, check=True, timeout=PDFTOTEXT_TIMEOUT_SECONDS,
+        )
+    except Exception:
+        return ""
+    for line in proc.stdout.decode("utf-8", errors="replace").splitlines():
+        if line.startswith("Title:"):
+            return line[len("Title:"):].strip()
+    return ""
+
+
+def _extract_text_from_pdf_pdftotext(path: Path) -> Tuple[str, str]:
+    proc = subprocess.run(
+        [PDFTOTEXT_PATH, "-layout", "-enc", "UTF-8", str(path), "-"],
+        capture_output=True, check=True, timeout=PDFTOTEXT_TIMEOUT_SECONDS,
+    )
+    full_text = proc.stdout.decode("utf-8", errors="replace")
+    title = _pdfinfo_title(path)
+    if not title:
+        # pdftotext separates pages with form feeds
+        title = _title_from_text(full_text.split("\f", 1)[0], path)
+    return title, full_text
+
+
+def _extract_text_from_pdf_pypdf(path: Path) -> Tuple[str, str]:
     reader = PdfReader(str(path))
-    text_pages = []
     title = ""
     try:
         meta = reader.metadata
@@ -43,22 +133,32 @@ def extract_text_from_pdf(path: Path) -> Tuple[str, str]:
     except Exception:
         title = ""
 
-    for page in reader.pages:
-        page_text = page.extract_text() or ""
-        text_pages.append(page_text)
-
-    full_text = "\n".join(text_pages)
-    if not title:
-        # crude heuristic: first non-empty line of first page
-        for line in text_pages[0].splitlines():
-            if line.strip():
-                title = line.strip()[:200]
-                break
+    first_page_text, full_text = _join_pages(
+        page.extract_text() or "" for page in reader.pages
+    )
     if not title:
-        title = path.stem
+        title = _title_from_text(first_page_text, path)
     return title, full_text
 
 
+def extract_text_from_pdf(path: Path) -> Tuple[str, str]:
+    """
+    Return (title, text).
+
+    Backends, fastest first: PyMuPDF (if installed), poppler's pdftotext
+    (if on PATH), then pure-Python pypdf. This is blocking; call it from a
+    worker thread in async code.
+    """
+    if fitz is not None:
+        return _extract_text_from_pdf_pymupdf(path)
+    if PDFTOTEXT_PATH:
+        try:
+            return _extract_text_from_pdf_pdftotext(path)
+        except (subprocess.SubprocessError, OSError):
+            pass  # fall through to pypdf
+    return _extract_text_from_pdf_pypdf(path)
+
+
 def extract_text_from_docx(path: Path) -> Tuple[str, str]:
     doc = DocxDocument(str(path))
     paras = [p.text for p in doc.paragraphs if p.text.strip()]
@@ -78,11 +178,36 @@ def write_txt(text: str, prefix: str) -> Path:
     return path
 
 
+def _docx_paragraph(text: str):
+    """Build a bare <w:p><w:r><w:t/></w:r></w:p>; single newlines become <w:br/>."""
+    p = OxmlElement("w:p")
+    r = OxmlElement("w:r")
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            r.append(OxmlElement("w:br"))
+        t = OxmlElement("w:t")
+        t.set(qn("xml:space"), "preserve")
+        t.text = line
+        r.append(t)
+    p.append(r)
+    return p
+
+
 def write_docx(text: str, prefix: str, title: str) -> Path:
     doc = DocxDocument()
     doc.add_heading(title, level=1)
-    for paragraph in text.split("\n\n"):
-        doc.add_paragraph(paragraph.strip())
+
+    # Append paragraph XML directly instead of add_paragraph() per block
+    paras = [_docx_paragraph(block) for block in (b.strip() for b in text.split("\n\n")) if block]
+    body = doc.element.body
+    sect_pr = body.find(qn("w:sectPr"))
+    if sect_pr is not None:
+        # section properties must stay the last child of <w:body>
+        idx = body.index(sect_pr)
+        body[idx:idx] = paras
+    else:
+        body.extend(paras)
+
     path = OUTPUT_DIR / f"{prefix}.docx"
     doc.save(str(path))
     return path
@@ -90,7 +215,9 @@ def write_docx(text: str, prefix: str, title: str) -> Path:
 
 # ---------- LaTeX helpers (from your templating/tectonic idea) ----------
 
+@functools.lru_cache(maxsize=None)
 def _tectonic_supports_new_cli(tectonic_path: str) -> bool:
+    # probed once per binary; the answer can't change while we're running
     try:
         help_out = subprocess.run(
             [tectonic_path, "-X", "compile", "--help"],
@@ -106,8 +233,8 @@ def compile_tex_to_pdf(tex_path: str) -> Tuple[bool, str]:
     workdir = tex_file.parent
     outdir = workdir
 
-    tectonic = shutil.which("tectonic")
-    pdflatex = shutil.which("pdflatex")
+    tectonic = TECTONIC_PATH
+    pdflatex = PDFLATEX_PATH
 
     try:
         if tectonic:
@@ -147,8 +274,120 @@ def compile_tex_to_pdf(tex_path: str) -> Tuple[bool, str]:
         return False, f"Exception during LaTeX compile: {e}"
 
 
-def write_latex_math_proof(body: str, prefix: str, title: str) -> Path:
-    template_str = r"""
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """
+    Make dst a hard link to src, or a copy where links aren't possible
+    (cross-device, or a filesystem without hard links). Raises
+    FileExistsError if dst exists: an existing file is never opened for
+    writing, since it may share its inode with a cached or served PDF.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM):
+            raise
+    tmp = dst.with_name(f"{dst.name}.{secrets.token_hex(8)}.tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _publish_cached(src: Path, dst: Path) -> None:
+    # swap the directory entry instead of rewriting dst in place
+    tmp = dst.with_name(f"{dst.name}.{secrets.token_hex(8)}.tmp")
+    _link_or_copy(src, tmp)
+    try:
+        os.replace(tmp, dst)
+    finally:
+        # also needed on success: rename() is a no-op when dst already
+        # links to the same inode, which leaves tmp behind
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _pdf_cache_prune() -> None:
+    entries = []
+    with os.scandir(OUTPUT_DIR) as it:
+        for e in it:
+            if e.name.startswith("cache_") and e.name.endswith(".pdf"):
+                try:
+                    entries.append((e.stat().st_mtime, e.path))
+                except FileNotFoundError:
+                    pass
+    if len(entries) <= PDF_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    for _, path in entries[: len(entries) - PDF_CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def compile_tex_to_pdf_cached(tex_path: str) -> Tuple[bool, str]:
+    """
+    compile_tex_to_pdf with a content-addressed cache in OUTPUT_DIR.
+
+    Identical .tex sources (e.g. a cached DeepSeek result rendered with the
+    same title) reuse the previously built PDF instead of re-running the
+    LaTeX engine, which does a full build every time. Like compile_tex_to_pdf
+    it never raises: any cache problem falls back to a normal compile.
+    """
+    tex_file = Path(tex_path)
+    try:
+        digest = hashlib.blake2b(tex_file.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return compile_tex_to_pdf(tex_path)
+    cache_path = OUTPUT_DIR / f"cache_{digest}.pdf"
+    target = tex_file.with_suffix(".pdf")
+
+    try:
+        _publish_cached(cache_path, target)
+    except OSError:
+        pass  # not cached (or evicted meanwhile): build it
+    else:
+        try:
+            os.utime(cache_path)  # mark as recently used
+        except OSError:
+            pass
+        return True, str(target)
+
+    # a previous target may be hard-linked to a cache entry; unlink it so the
+    # engine writes a fresh file instead of rewriting the cached one in place
+    try:
+        target.unlink()
+    except OSError:
+        pass
+
+    ok, pdf_path = compile_tex_to_pdf(tex_path)
+    if ok:
+        try:
+            _link_or_copy(Path(pdf_path), cache_path)
+        except FileExistsError:
+            pass  # a concurrent job with the same source cached it first
+        except OSError:
+            pass  # caching is best-effort
+        else:
+            try:
+                _pdf_cache_prune()
+            except OSError:
+                pass
+    return ok, pdf_path
+
+
+# Templates are compiled once at import; the writers only render.
+_LATEX_ENV = Environment(autoescape=False, trim_blocks=True, lstrip_blocks=True)
+
+_MATH_PROOF_TMPL = _LATEX_ENV.from_string(r"""
 \documentclass{article}
 \usepackage[utf8]{inputenc}
 \usepackage{amsmath, amssymb, amsthm}
@@ -161,16 +400,9 @@ def write_latex_math_proof(body: str, prefix: str, title: str) -> Path:
 {{ body }}
 
 \end{document}
-"""
-    t = Template(template_str)
-    tex_content = t.render(title=title, body=body)
-    tex_path = OUTPUT_DIR / f"{prefix}.tex"
-    tex_path.write_text(tex_content, encoding="utf-8")
-    return tex_path
-
+""")
 
-def write_latex_research_summary(body: str, prefix: str, title: str) -> Path:
-    template_str = r"""
+_RESEARCH_SUMMARY_TMPL = _LATEX_ENV.from_string(r"""
 \documentclass{article}
 \usepackage[utf8]{inputenc}
 \usepackage{geometry}
@@ -182,9 +414,18 @@ def write_latex_research_summary(body: str, prefix: str, title: str) -> Path:
 {{ body }}
 
 \end{document}
-"""
-    t = Template(template_str)
-    tex_content = t.render(title=title, body=body)
+""")
+
+
+def write_latex_math_proof(body: str, prefix: str, title: str) -> Path:
+    tex_content = _MATH_PROOF_TMPL.render(title=title, body=body)
+    tex_path = OUTPUT_DIR / f"{prefix}.tex"
+    tex_path.write_text(tex_content, encoding="utf-8")
+    return tex_path
+
+
+def write_latex_research_summary(body: str, prefix: str, title: str) -> Path:
+    tex_content = _RESEARCH_SUMMARY_TMPL.render(title=title, body=body)
     tex_path = OUTPUT_DIR / f"{prefix}.tex"
     tex_path.write_text(tex_content, encoding="utf-8")
     return tex_path
@@ -194,21 +435,32 @@ def write_latex_research_summary(body: str, prefix: str, title: str) -> Path:
 # RELATED ARTICLES (SerpAPI / Google Scholar)
 # ============================================================
 
-def retrieve_scholar_articles(
+# first plausible publication year in a "publication_info" summary
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+async def retrieve_scholar_articles(
     professional_fields: List[str],
     date_window: Tuple[int, int],
     num_of_articles: int = 10,
     language: str = "en",
     include_patents: bool = False,
     api_key: str = "",
-    extra_params: Optional[dict] = None
+    extra_params: Optional[dict] = None,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> List[dict]:
+    """
+    Query Google Scholar (via SerpApi) for every field concurrently.
+    Reuses the shared pooled httpx client unless one is passed in.
+    """
     if not api_key:
         raise ValueError("You must provide a valid SerpApi api_key.")
     base_url = "https://serpapi.com/search"
-    results: List[dict] = []
 
-    for field in professional_fields:
+    if client is None:
+        from api.llms.calls import _get_http_client
+        client = await _get_http_client()
+
+    async def _search(field: str) -> List[dict]:
         params = {
             "engine": "google_scholar",
             "q": field,
@@ -223,19 +475,17 @@ def retrieve_scholar_articles(
         if extra_params:
             params.update(extra_params)
 
-        resp = requests.get(base_url, params=params)
+        resp = await client.get(base_url, params=params)
         data = resp.json()
         if data.get("search_metadata", {}).get("status") != "Success":
             raise RuntimeError(f"Search failed for field '{field}': {data}")
 
+        field_results: List[dict] = []
         for item in data.get("organic_results", []):
             pub_info = item.get("publication_info", {}).get("summary", "")
-            year = None
-            for token in pub_info.split():
-                if token.isdigit() and len(token) == 4:
-                    year = token
-                    break
-            results.append({
+            m = _YEAR_RE.search(pub_info)
+            year = m.group(0) if m else None
+            field_results.append({
                 "field": field,
                 "title": item.get("title"),
                 "link": item.get("link"),
@@ -243,4 +493,8 @@ def retrieve_scholar_articles(
                 "publication_year": year,
                 "snippet": item.get("snippet"),
             })
+        return field_results
+
+    per_field = await asyncio.gather(*(_search(field) for field in professional_fields))
+    results: List[dict] = [r for field_results in per_field for r in field_results]
     return results[:num_of_articles]
@@ -1,10 +1,15 @@
 import os
 import time
+import importlib.util
 import hashlib
+import threading
+from collections import OrderedDict
+from itertools import islice
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, Literal, Tuple
 
 import httpx
+import orjson
 
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
@@ -18,6 +23,15 @@ DEEPSEEK_CACHE_MAX_ITEMS = int(os.getenv("DEEPSEEK_CACHE_MAX_ITEMS", "512"))
 
 # Timeouts
 DEEPSEEK_TIMEOUT_SECONDS = float(os.getenv("DEEPSEEK_TIMEOUT_SECONDS", "120"))
+DEEPSEEK_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DEEPSEEK_CONNECT_TIMEOUT_SECONDS", "10"))
+
+# Connection pool (keep-alive so back-to-back calls skip the TLS handshake)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+# HTTP/2 needs the optional `h2` package (httpx[http2])
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
 
 TaskPreset = Literal[
     "code_math",
@@ -51,18 +65,23 @@ def _temperature_for_preset(preset: TaskPreset) -> float:
 
 
 def _prompt_hash(prompt: str) -> str:
-    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    """Cache key digest (not security-sensitive, so BLAKE2b over SHA-256)."""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class _CacheEntry:
     value: str
     expires_at: float
 
 
-# Simple in-memory TTL cache (per-process).
+# Simple in-memory TTL + LRU cache (per-process).
 # If you need multi-worker / cross-instance caching, plug in Redis later.
-_DEEPSEEK_CACHE: Dict[Tuple[str, float, str], _CacheEntry] = {}
+_DEEPSEEK_CACHE: "OrderedDict[Tuple[str, float, str], _CacheEntry]" = OrderedDict()
+_DEEPSEEK_CACHE_LOCK = threading.Lock()
+
+# How many least-recently-used entries to check for expiry on each insert
+_CACHE_SWEEP_LIMIT = 32
 
 # Shared HTTP client (connection pooling)
 _HTTP_CLIENT: Optional[httpx.AsyncClient] = None
@@ -71,37 +90,51 @@ _HTTP_CLIENT: Optional[httpx.AsyncClient] = None
 async def _get_http_client() -> httpx.AsyncClient:
     global _HTTP_CLIENT
     if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
-        _HTTP_CLIENT = httpx.AsyncClient(timeout=DEEPSEEK_TIMEOUT_SECONDS)
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=httpx.Timeout(DEEPSEEK_TIMEOUT_SECONDS, connect=DEEPSEEK_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
     return _HTTP_CLIENT
 
 
 def _cache_get(key: Tuple[str, float, str]) -> Optional[str]:
     if not DEEPSEEK_CACHE_ENABLED:
         return None
-    entry = _DEEPSEEK_CACHE.get(key)
-    if not entry:
-        return None
-    if time.time() >= entry.expires_at:
-        _DEEPSEEK_CACHE.pop(key, None)
-        return None
-    return entry.value
+    with _DEEPSEEK_CACHE_LOCK:
+        entry = _DEEPSEEK_CACHE.get(key)
+        if not entry:
+            return None
+        if time.time() >= entry.expires_at:
+            _DEEPSEEK_CACHE.pop(key, None)
+            return None
+        _DEEPSEEK_CACHE.move_to_end(key)
+        return entry.value
 
 
 def _cache_set(key: Tuple[str, float, str], value: str) -> None:
     if not DEEPSEEK_CACHE_ENABLED:
         return
-    # basic eviction: if too many items, drop oldest-ish by expiry
-    if len(_DEEPSEEK_CACHE) >= DEEPSEEK_CACHE_MAX_ITEMS:
-        # remove a few expired; if none expired, remove one arbitrary oldest by expires_at
+    entry = _CacheEntry(value=value, expires_at=time.time() + DEEPSEEK_CACHE_TTL_SECONDS)
+    with _DEEPSEEK_CACHE_LOCK:
+        # drop stale entries from the LRU end without materializing the whole dict
         now = time.time()
-        expired_keys = [k for k, v in _DEEPSEEK_CACHE.items() if v.expires_at <= now]
-        for k in expired_keys[:32]:
-            _DEEPSEEK_CACHE.pop(k, None)
-        if len(_DEEPSEEK_CACHE) >= DEEPSEEK_CACHE_MAX_ITEMS:
-            oldest_key = min(_DEEPSEEK_CACHE.items(), key=lambda kv: kv[1].expires_at)[0]
-            _DEEPSEEK_CACHE.pop(oldest_key, None)
+        expired = [
+            k for k, v in islice(_DEEPSEEK_CACHE.items(), _CACHE_SWEEP_LIMIT)
+            if v.expires_at <= now
+        ]
+        for k in expired:
+            del _DEEPSEEK_CACHE[k]
 
-    _DEEPSEEK_CACHE[key] = _CacheEntry(value=value, expires_at=time.time() + DEEPSEEK_CACHE_TTL_SECONDS)
+        _DEEPSEEK_CACHE[key] = entry
+        _DEEPSEEK_CACHE.move_to_end(key)
+        # LRU eviction, O(1) per dropped item
+        while len(_DEEPSEEK_CACHE) > DEEPSEEK_CACHE_MAX_ITEMS:
+            _DEEPSEEK_CACHE.popitem(last=False)
 
 
 async def call_deepseek(
@@ -152,7 +185,7 @@ async def call_deepseek(
     if resp.status_code != 200:
         raise RuntimeError(f"DeepSeek error: {resp.status_code} {resp.text}")
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
     try:
         content = data["choices"][0]["message"]["content"]
     except Exception as e:
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import os
+import sys
+import asyncio
 from pathlib import Path
 from datetime import datetime
+from time import time_ns
 from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.orm import Session, undefer
+from typing import Optional, Tuple
 
 # Local imports
 from api.db import get_db, Document, Job, init_db
@@ -20,12 +23,15 @@ from api.functions import (
     write_docx,
     write_latex_math_proof,
     write_latex_research_summary,
-    compile_tex_to_pdf,
+    compile_tex_to_pdf_cached,
     retrieve_scholar_articles,
 )
 from api.prompt_calls.prompt_patterns import (
     PROMPT_OUTPUT_DIR,
     generate_prompt_from_patterns,
+    start_prompt_writer,
+    stop_prompt_writer,
+    wait_for_prompt_write,
 )
 
 from api.prompt_calls.model import TagIn, PromptBuilderRequest, PromptBuilderResponse
@@ -33,7 +39,8 @@ from api.prompt_calls.model import TagIn, PromptBuilderRequest, PromptBuilderRes
 
 
 from api.prompt_calls.prompt import build_prompt
-from api.llms.calls import call_deepseek
+from api.prompt_calls.store import catalog_json_bytes
+from api.llms.calls import call_deepseek, _get_http_client, close_deepseek_client
 
 load_dotenv()
 
@@ -42,12 +49,32 @@ load_dotenv()
 # CONFIG
 # ------------------------------------------------------------
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY", "")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+# Per task (indexed by TaskTypeId): (allowed output formats, default).
+# None means the format is fixed and the request's value is ignored.
+_OUTPUT_FORMATS: Tuple[Tuple[Optional[Tuple[str, ...]], str], ...] = (
+    (None, "txt"),               # short_summary
+    (None, "docx"),              # long_summary
+    (("docx", "pdf"), "docx"),   # research_summary
+    (("tex", "pdf"), "pdf"),     # math_proof
+    (None, "txt"),               # prompt_draft
+)
+
+# Download content types for generated job files
+_MEDIA_TYPES = {
+    ".txt": "text/plain",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".tex": "application/x-tex",
+}
 
 
 # ------------------------------------------------------------
 # FASTAPI APP
 # ------------------------------------------------------------
-app = FastAPI(title="Research Assistant Backend")
+app = FastAPI(title="Research Assistant Backend", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +89,35 @@ app.add_middleware(
 init_db()
 
 
+@app.on_event("startup")
+async def _startup_http_client() -> None:
+    # create the pooled client up front so the first request doesn't pay for it
+    await _get_http_client()
+
+
+@app.on_event("shutdown")
+async def _shutdown_http_client() -> None:
+    await close_deepseek_client()
+
+
+@app.on_event("shutdown")
+async def _shutdown_tts_client() -> None:
+    # api.tts is imported lazily by the audio routes; only close it if loaded
+    tts = sys.modules.get("api.tts")
+    if tts is not None:
+        await tts.close_tts_client()
+
+
+@app.on_event("startup")
+async def _startup_prompt_writer() -> None:
+    start_prompt_writer()
+
+
+@app.on_event("shutdown")
+async def _shutdown_prompt_writer() -> None:
+    await stop_prompt_writer()
+
+
 # ------------------------------------------------------------
 # STATIC PATHS
 # ------------------------------------------------------------
@@ -73,6 +129,30 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
+# ------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------
+
+async def _save_upload(file: UploadFile, file_path: Path) -> None:
+    """
+    Stream an upload to disk chunk by chunk (file writes run in a worker
+    thread). Enforces MAX_UPLOAD_BYTES and removes partial files on failure.
+    """
+    out = await asyncio.to_thread(file_path.open, "wb")
+    written = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Uploaded file is too large.")
+            await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        file_path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(out.close)
+
+
 # ------------------------------------------------------------
 # ROUTES
 # ------------------------------------------------------------
@@ -95,16 +175,19 @@ async def upload_document(file: UploadFile = File(...), db: Session = Depends(ge
     original_name = file.filename or "uploaded_file"
     suffix = Path(original_name).suffix or ".bin"
 
-    # Save to disk
-    file_path = UPLOAD_DIR / f"{datetime.utcnow().timestamp()}{suffix}"
-    with file_path.open("wb") as f:
-        f.write(await file.read())
+    # Reject early when the client told us the size
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large.")
+
+    # Save to disk, streaming in chunks so memory stays flat
+    file_path = UPLOAD_DIR / f"{time_ns()}{suffix}"
+    await _save_upload(file, file_path)
 
     # Extract text
     if suffix.lower() == ".pdf":
-        title, text = extract_text_from_pdf(file_path)
+        title, text = await asyncio.to_thread(extract_text_from_pdf, file_path)
     else:
-        title, text = extract_text_from_docx(file_path)
+        title, text = await asyncio.to_thread(extract_text_from_docx, file_path)
 
     # Persist to DB
     doc = Document(
@@ -128,37 +211,29 @@ async def generate_task(payload: GenerateRequest, db: Session = Depends(get_db))
     """
     Runs an LLM task (summary, proof, etc.) → creates file → DB job record.
     """
-    doc = db.query(Document).filter(Document.id == payload.document_id).first()
+    # content is deferred on the model; we need it here, so load it in the same SELECT
+    doc = db.get(Document, payload.document_id, options=[undefer(Document.content)])
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found.")
 
     task = payload.task_type
-    output_format = (payload.output_format or "").lower()
+    output_format = payload.output_format.lower()
 
     # Default output formats
-    if task == "short_summary":
-        output_format = "txt"
-    elif task == "long_summary":
-        output_format = "docx"
-    elif task == "research_summary":
-        if output_format not in ("docx", "pdf", ""):
-            raise HTTPException(status_code=400, detail="Invalid research_summary format.")
-        if not output_format:
-            output_format = "docx"
-    elif task == "math_proof":
-        if output_format not in ("tex", "pdf", ""):
-            raise HTTPException(status_code=400, detail="Invalid math_proof format.")
-        if not output_format:
-            output_format = "pdf"
-    elif task == "prompt_draft":
-        output_format = "txt"
+    allowed_formats, default_format = _OUTPUT_FORMATS[payload.task_id]
+    if allowed_formats is None:
+        output_format = default_format
+    elif not output_format:
+        output_format = default_format
+    elif output_format not in allowed_formats:
+        raise HTTPException(status_code=400, detail=f"Invalid {task} format.")
 
     # Build prompt + call DeepSeek
-    prompt = build_prompt(task, doc.title, doc.content, payload.extra_instructions)
+    prompt = build_prompt(payload.task_id, doc.title, doc.content, payload.extra_instructions)
     result_text = await call_deepseek(prompt)
 
     # Determine file prefix
-    prefix = f"{datetime.utcnow().timestamp()}_{task}"
+    prefix = f"{time_ns()}_{task}"
 
     # ------------------------------------------------------
     # Write file based on task
@@ -175,7 +250,7 @@ async def generate_task(payload: GenerateRequest, db: Session = Depends(get_db))
         else:
             # PDF via LaTeX
             tex_path = write_latex_research_summary(result_text, prefix, doc.title)
-            ok, pdf_path = compile_tex_to_pdf(str(tex_path))
+            ok, pdf_path = await asyncio.to_thread(compile_tex_to_pdf_cached, str(tex_path))
             if not ok:
                 raise HTTPException(status_code=500, detail=f"LaTeX compile failed: {pdf_path}")
             file_path = Path(pdf_path)
@@ -185,7 +260,7 @@ async def generate_task(payload: GenerateRequest, db: Session = Depends(get_db))
         if output_format == "tex":
             file_path = tex_path
         else:
-            ok, pdf_path = compile_tex_to_pdf(str(tex_path))
+            ok, pdf_path = await asyncio.to_thread(compile_tex_to_pdf_cached, str(tex_path))
             if not ok:
                 raise HTTPException(status_code=500, detail=f"LaTeX compile failed: {pdf_path}")
             file_path = Path(pdf_path)
@@ -206,10 +281,14 @@ async def generate_task(payload: GenerateRequest, db: Session = Depends(get_db))
     preview = result_text[:1000]
     download_url = f"/api/jobs/{job.id}/download"
 
-    return GenerateResponse(
-        job_id=job.id,
-        download_url=download_url,
-        result_preview=preview,
+    # Returned as a Response, so FastAPI skips re-validating it against
+    # response_model (kept for the OpenAPI schema); orjson encodes the dict.
+    return ORJSONResponse(
+        {
+            "job_id": job.id,
+            "download_url": download_url,
+            "result_preview": preview,
+        }
     )
 
 
@@ -218,7 +297,7 @@ async def download_job(job_id: int, db: Session = Depends(get_db)):
     """
     Download the generated output file (.txt, .docx, .tex, .pdf)
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
 
@@ -226,13 +305,7 @@ async def download_job(job_id: int, db: Session = Depends(get_db)):
     if not path.exists():
         raise HTTPException(status_code=404, detail="File missing.")
 
-    media = "text/plain"
-    if path.suffix == ".pdf":
-        media = "application/pdf"
-    elif path.suffix == ".docx":
-        media = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    elif path.suffix == ".tex":
-        media = "application/x-tex"
+    media = _MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
 
     return FileResponse(path, media_type=media, filename=path.name)
 
@@ -251,7 +324,7 @@ async def related_articles(
         raise HTTPException(status_code=500, detail="SERPAPI_API_KEY missing")
 
     try:
-        articles = retrieve_scholar_articles(
+        articles = await retrieve_scholar_articles(
             [query],
             date_window=(start_year, end_year),
             num_of_articles=num,
@@ -260,7 +333,7 @@ async def related_articles(
         )
         return {"query": query, "articles": articles}
     except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
+        return ORJSONResponse({"error": str(e)}, status_code=500)
 
 
 
@@ -278,7 +351,7 @@ async def job_audio(job_id: int, db: Session = Depends(get_db)):
     - Otherwise, call ElevenLabs via text_to_audio_eleven and save to disk.
     - Stream the MP3 back as a FileResponse.
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
 
@@ -300,7 +373,7 @@ async def job_audio(job_id: int, db: Session = Depends(get_db)):
 async def job_audio_stream(job_id: int, db: Session = Depends(get_db)):
     # tts import
     from api.tts import text_to_audio_eleven, AUDIO_DIR
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -331,7 +404,9 @@ async def prompt_builder_endpoint(payload: PromptBuilderRequest) -> PromptBuilde
     tags = [TagIn(name=t.name.strip(), value=t.value.strip()) for t in payload.tags]
 
     try:
-        result = await generate_prompt_from_patterns(tags, payload.pattern_names)
+        result = await generate_prompt_from_patterns(
+            tags, payload.pattern_names, num_candidates=payload.num_candidates
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -352,6 +427,18 @@ async def prompt_builder_endpoint(payload: PromptBuilderRequest) -> PromptBuilde
     )
 
 
+# -------------------------------------------------------------------
+# GET /api/prompt-patterns
+# -------------------------------------------------------------------
+
+@app.get("/api/prompt-patterns")
+async def list_prompt_patterns() -> Response:
+    """
+    The detailed prompt-pattern catalogue, served from pre-encoded JSON.
+    """
+    return Response(content=catalog_json_bytes(), media_type="application/json")
+
+
 # -------------------------------------------------------------------
 # GET /api/prompt-files/{filename}
 # -------------------------------------------------------------------
@@ -366,6 +453,11 @@ async def download_prompt_file(filename: str):
         raise HTTPException(status_code=400, detail="Invalid filename")
 
     path = PROMPT_OUTPUT_DIR / filename
+    # the prompt-builder response may arrive before its background write lands
+    try:
+        await wait_for_prompt_write(path)
+    except OSError:
+        raise HTTPException(status_code=500, detail="Prompt file could not be written")
     if not path.exists():
         raise HTTPException(status_code=404, detail="File not found")
 
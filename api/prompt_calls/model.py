@@ -1,7 +1,7 @@
 # -------------------------------------------------------------------
 # Pydantic models for request/response
 # -------------------------------------------------------------------
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from dataclasses import dataclass
 
@@ -13,6 +13,8 @@ class TagIn(BaseModel):
 class PromptBuilderRequest(BaseModel):
     tags: List[TagIn]
     pattern_names: List[str]
+    # >1 samples several candidates in one LLM request and keeps the best-scoring
+    num_candidates: int = Field(default=1, ge=1, le=8)
 
 
 class PromptBuilderResponse(BaseModel):
@@ -22,7 +24,7 @@ class PromptBuilderResponse(BaseModel):
     download_url: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PromptResult:
     prompt_text: str
     score: float
@@ -7,22 +7,33 @@ Responsibilities:
     * react_patterns.csv
 - Build a tag context from UI tags.
 - Build a pattern context from selected pattern names.
-- Assemble a meta-prompt and call a free model via OpenRouter.
+- Assemble a meta-prompt and call a free model via OpenRouter
+  (several meta-prompts can share one call, see generate_prompts_batched).
 - Score the generated prompt.
 - Save accepted prompts as .txt files for download.
 """
 
 from __future__ import annotations
+import asyncio
+import csv
+import functools
+import hashlib
+import itertools
 import os
-from datetime import datetime
+import re
+import sys
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, cast, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Sequence, Tuple, cast, Optional
 from openai import OpenAI
 import anyio
-import pandas as pd
 from api.prompt_calls.model import TagIn, PromptResult
-from api.prompt_calls.score import score_generated_prompt
+from api.prompt_calls.score import score_generated_prompt, score_generated_prompts
 import json
+import logging
+
+logger = logging.getLogger("prompt_patterns")
 
 # -------------------------------------------------------------------
 # Paths and config
@@ -51,18 +62,56 @@ if not OPENROUTER_API_KEY:
     # raise RuntimeError("OPENROUTER_API_KEY is not set")
     pass
 
-openrouter_client = OpenAI(
-    base_url=OPENROUTER_BASE_URL,
-    api_key=OPENROUTER_API_KEY,
-    default_headers={
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": OPENROUTER_REFERRER,
-        "X-Title": OPENROUTER_APP_TITLE,
-    },
-)
+
+@functools.lru_cache(maxsize=1)
+def _openrouter_client() -> OpenAI:
+    # created on first use so a bad config fails the request, not the import
+    return OpenAI(
+        base_url=OPENROUTER_BASE_URL,
+        api_key=OPENROUTER_API_KEY,
+        default_headers={
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            "HTTP-Referer": OPENROUTER_REFERRER,
+            "X-Title": OPENROUTER_APP_TITLE,
+        },
+    )
 
 
 MIN_PROMPT_SCORE = 0.6  # acceptance threshold
+PROMPT_BATCH_SIZE = int(os.getenv("PROMPT_BATCH_SIZE", "8"))  # meta-prompts per OpenRouter call
+# Streamed generations are cut off past this many words; the scorer already
+# penalises anything over 600 tokens, so the rest is not worth waiting for.
+PROMPT_MAX_WORDS = int(os.getenv("PROMPT_MAX_WORDS", "800"))
+
+# The invariant instructions live entirely in the system message, so every
+# request starts with the same bytes and provider prefix caches can hit;
+# the user message carries only the per-request blocks.
+_META_PROMPT_LAYOUT = (
+    "Each meta-prompt contains a <Tag Context> block with the user's parameters, "
+    "a <Pattern Embeddings> block with the prompt patterns to apply, "
+    "and optionally enforcement rules the prompt must follow."
+)
+
+SYSTEM_PROMPT = (
+    "You are an expert prompt engineer. "
+    "Your job is to produce a single high-quality prompt that the user can reuse. "
+    + _META_PROMPT_LAYOUT + "\n\n"
+    "Return ONLY the final prompt text. Do not explain your reasoning. Do not add commentary."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are an expert prompt engineer. "
+    "You will receive several independent meta-prompts, each introduced by an index like [0], [1], ... "
+    "For EACH meta-prompt, produce a single high-quality, ready-to-use prompt. "
+    + _META_PROMPT_LAYOUT + "\n\n"
+    "Start each answer on its own line with the same [index] as its meta-prompt, keep the original order, "
+    "and output only the final prompt texts, with no explanations or commentary."
+)
+
+# In-process TTL + LRU cache of generated prompts, keyed by meta-prompt hash.
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_MAX_ITEMS = int(os.getenv("PROMPT_CACHE_MAX_ITEMS", "1024"))
 
 
 # Helpers 
@@ -87,8 +136,24 @@ def _parse_jsonish(value: Any, default: Any) -> Any:
     return default
 
 
+def _process_tags(tags: List[TagIn]) -> Tuple[Dict[str, str], str]:
+    """
+    One pass over the tags, producing both the name -> value map and the
+    <tag> context block (see build_tag_context).
+    """
+    tag_map: Dict[str, str] = {}
+    lines: List[str] = []
+    for t in tags:
+        name, value = t.name.strip(), t.value.strip()
+        if not name or not value:
+            continue
+        tag_map[name] = value
+        lines.append(f"<{name}> {value}")
+    return tag_map, "\n".join(lines)
+
+
 def tags_to_dict(tags: List[TagIn]) -> Dict[str, str]:
-    return {t.name.strip(): t.value.strip() for t in tags if t.name and t.value}
+    return _process_tags(tags)[0]
 
 
 def extract_required_slot_maybe(pattern_row: Dict[str, Any], slot_name: str) -> Optional[Dict[str, Any]]:
@@ -107,6 +172,7 @@ def extract_required_slot_maybe(pattern_row: Dict[str, Any], slot_name: str) ->
 
     for col in candidates:
         raw = pattern_row.get(col)
+        # rows from _patterns_by_name() are already parsed; this is a no-op for them
         slots = _parse_jsonish(raw, default=[])
         if not slots:
             continue
@@ -126,7 +192,7 @@ def extract_required_slot_maybe(pattern_row: Dict[str, Any], slot_name: str) ->
     return None
 
 
-def enforce_ask_for_input(pattern_row: Dict[str, Any], tags: List[TagIn]) -> str:
+def enforce_ask_for_input(pattern_row: Dict[str, Any], tag_map: Dict[str, str]) -> str:
     """
     Enforces Ask-for-Input even if CSV slot metadata is missing.
     Priority:
@@ -135,8 +201,6 @@ def enforce_ask_for_input(pattern_row: Dict[str, Any], tags: List[TagIn]) -> str
       3) CSV slot description (if present)
       4) generic fallback
     """
-    tag_map = tags_to_dict(tags)
-
     slot_def = extract_required_slot_maybe(pattern_row, "input_label_X")
     slot_desc = (slot_def or {}).get("description", "") if slot_def else ""
 
@@ -164,7 +228,7 @@ Output constraint:
 
 
 
-def build_enforcement_context(pattern_rows: List[Dict[str, Any]], tags: List[TagIn]) -> str:
+def build_enforcement_context(pattern_rows: List[Dict[str, Any]], tag_map: Dict[str, str]) -> str:
     """
     Build a combined enforcement section from all selected pattern rows.
     """
@@ -174,7 +238,7 @@ def build_enforcement_context(pattern_rows: List[Dict[str, Any]], tags: List[Tag
         name = (row.get("pattern_name") or "").strip()
 
         if name == "Ask for Input":
-            blocks.append(enforce_ask_for_input(row, tags))
+            blocks.append(enforce_ask_for_input(row, tag_map))
 
         # Add future enforcers here, e.g.:
         # if name == "Fact Check List": blocks.append(enforce_fact_check_list(row, tags))
@@ -188,43 +252,117 @@ def build_enforcement_context(pattern_rows: List[Dict[str, Any]], tags: List[Tag
 # Pattern loading
 # -------------------------------------------------------------------
 
-def _load_csv(path: Path) -> pd.DataFrame:
+def _load_csv(path: Path, source: str) -> List[Dict[str, Any]]:
     if not path.exists():
         raise FileNotFoundError(f"Pattern CSV not found: {path}")
-    df = pd.read_csv(path)
-    # normalise column names a bit
-    df.columns = [c.strip() for c in df.columns]
-    return df
-
-
-# Load at import time so we only hit disk once
-DETAILED_DF = _load_csv(CSV_DETAILED)
-REACT_DF = _load_csv(CSV_REACT)
-
-# Combined view with a "source" column
-ALL_PATTERNS_DF = pd.concat(
-    [
-        DETAILED_DF.assign(source="detailed"),
-        REACT_DF.assign(source="react"),
-    ],
-    ignore_index=True,
+    with path.open(newline="", encoding="utf-8") as fh:
+        rows: List[Dict[str, Any]] = []
+        for raw in csv.DictReader(fh):
+            # normalise column names a bit
+            row: Dict[str, Any] = {k.strip(): v for k, v in raw.items()}
+            row["source"] = source
+            rows.append(row)
+    return rows
+
+
+# Columns that hold JSON in the CSVs; parsed once here instead of per request
+_JSON_COLUMNS = (
+    "input_fields",
+    "output_fields",
+    "workflow_structure",
+    "control_flags",
+    "typical_use_cases",
+    "risks_and_misuses",
+    "required_slots",
+    "slots_required",
+    "required_inputs",
+    "inputs_required",
 )
 
 
-def get_patterns_by_name(names: Iterable[str]) -> List[Dict[str, Any]]:
+def _intern_keys(obj: Any) -> Any:
     """
-    Look up patterns by pattern_name from both CSVs.
-    Returns a list of plain dict rows.
+    Recursively intern dict keys. json.loads only shares keys within one
+    document, so without this every row of a JSON column holds its own copy
+    of "name", "description", "required", ...
+    """
+    if isinstance(obj, dict):
+        return {sys.intern(k) if isinstance(k, str) else k: _intern_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_intern_keys(v) for v in obj]
+    return obj
+
+
+def _build_patterns_by_name(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    patterns: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        for col in _JSON_COLUMNS:
+            if col in row:
+                parsed = _parse_jsonish(row[col], default=None)
+                if parsed is not None:
+                    row[col] = _intern_keys(parsed)
+        # enum-like value shared by several rows
+        if isinstance(row.get("pattern_family"), str):
+            row["pattern_family"] = sys.intern(row["pattern_family"])
+        name = str(row.get("pattern_name", "")).strip()
+        if name:
+            # first definition wins if a name appears in both CSVs
+            patterns.setdefault(name, row)
+    return patterns
+
+
+@functools.lru_cache(maxsize=1)
+def _patterns_by_name() -> Dict[str, Dict[str, Any]]:
+    """
+    Both CSVs, parsed and indexed by pattern_name. Loaded on first use and
+    kept for the life of the process, so disk is only hit once.
     """
-    name_set = {n.strip() for n in names}
-    if not name_set:
-        return []
+    return _build_patterns_by_name(
+        [*_load_csv(CSV_DETAILED, "detailed"), *_load_csv(CSV_REACT, "react")]
+    )
+
+
+def _render_pattern_brief(row: Dict[str, Any]) -> str:
+    """
+    We rely on the following columns being present in the CSV:
+    - pattern_name
+    - pattern_family
+    - primary_purpose
+    - core_mechanism
+    - example_prompt_skeleton
+    Any missing column is treated as empty text.
+    """
+    # Some columns may be JSON strings; that's fine for a model.
+    name = str(row.get("pattern_name", "")).strip()
+    family = str(row.get("pattern_family", "")).strip()
+    purpose = str(row.get("primary_purpose", "")).strip()
+    mech = str(row.get("core_mechanism", "")).strip()
+    skeleton = str(row.get("example_prompt_skeleton", "")).strip()
+
+    return (
+        f"Pattern name: {name}\n"
+        f"Family: {family}\n"
+        f"Primary purpose: {purpose}\n"
+        f"Core mechanism: {mech}\n"
+        f"Example skeleton:\n{skeleton}\n"
+        "----\n"
+    )
 
-    subset = ALL_PATTERNS_DF[ALL_PATTERNS_DF["pattern_name"].isin(name_set)]
-    rows = subset.to_dict(orient="records")
 
-    # Pandas returns list[dict[Hashable, Any]], which we know are str keys here.
-    return cast(List[Dict[str, Any]], rows)
+@functools.lru_cache(maxsize=1)
+def _pattern_brief() -> Dict[str, str]:
+    # Rows are immutable after load, so each brief is rendered exactly once
+    return {name: _render_pattern_brief(row) for name, row in _patterns_by_name().items()}
+
+
+def get_patterns_by_name(names: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Look up patterns by pattern_name from both CSVs.
+    Returns the pre-parsed rows (shared; treat as read-only), in request order.
+    """
+    patterns = _patterns_by_name()
+    wanted = dict.fromkeys(n.strip() for n in names)
+    return [patterns[n] for n in wanted if n in patterns]
 
 
 # -------------------------------------------------------------------
@@ -235,12 +373,7 @@ def build_tag_context(tags: List[TagIn]) -> str:
     """
     Turn a list of Tag objects into the <tag> context block.
     """
-    lines: List[str] = []
-    for t in tags:
-        if not t.value.strip():
-            continue
-        lines.append(f"<{t.name}> {t.value}")
-    return "\n".join(lines)
+    return _process_tags(tags)[1]
 
 
 def build_pattern_context(pattern_rows: List[Dict[str, Any]]) -> str:
@@ -248,34 +381,21 @@ def build_pattern_context(pattern_rows: List[Dict[str, Any]]) -> str:
     Turn pattern rows from the CSV into a compact textual "pattern brief"
     for the prompt generator model.
 
-    We rely on the following columns being present in the CSV:
-    - pattern_name
-    - pattern_family
-    - primary_purpose
-    - core_mechanism
-    - example_prompt_skeleton
-    Any missing column is treated as empty text.
+    Briefs of indexed patterns are rendered once (_pattern_brief);
+    other rows are rendered on the fly.
     """
-    parts: List[str] = []
+    briefs = _pattern_brief()
+    return "".join(
+        briefs.get(str(row.get("pattern_name", "")).strip())
+        or _render_pattern_brief(row)
+        for row in pattern_rows
+    )
 
-    for row in pattern_rows:
-        # Some columns may be JSON strings; that's fine for a model.
-        name = str(row.get("pattern_name", "")).strip()
-        family = str(row.get("pattern_family", "")).strip()
-        purpose = str(row.get("primary_purpose", "")).strip()
-        mech = str(row.get("core_mechanism", "")).strip()
-        skeleton = str(row.get("example_prompt_skeleton", "")).strip()
-
-        parts.append(
-            f"Pattern name: {name}\n"
-            f"Family: {family}\n"
-            f"Primary purpose: {purpose}\n"
-            f"Core mechanism: {mech}\n"
-            f"Example skeleton:\n{skeleton}\n"
-            "----\n"
-        )
 
-    return "".join(parts)
+def _block(text: str) -> str:
+    # always exactly one trailing newline, no leading blank lines
+    text = text.strip()
+    return f"{text}\n" if text else ""
 
 
 def build_prompt_generator_instruction(
@@ -283,79 +403,321 @@ def build_prompt_generator_instruction(
     pattern_context: str,
     enforcement_context: str = "",
 ) -> str:
-    enforcement_block = f"\n\n{enforcement_context}\n" if enforcement_context.strip() else ""
-
-    return f"""
-You are an expert prompt engineer. Your job is to produce a single high-quality prompt that the user can reuse.
-
-<Tag Context>
-{tag_context}
-</Tag Context>
-
-<Pattern Embeddings>
-{pattern_context}
-</Pattern Embeddings>
-{enforcement_block}
-
-Return ONLY the final prompt text. Do not explain your reasoning. Do not add commentary.
-""".strip()
+    """
+    Assemble the per-request meta-prompt (the user message). The constant
+    instructions are in SYSTEM_PROMPT / BATCH_SYSTEM_PROMPT.
+    """
+    parts = [
+        "<Tag Context>\n",
+        _block(tag_context),
+        "</Tag Context>\n\n",
+        "<Pattern Embeddings>\n",
+        _block(pattern_context),
+        "</Pattern Embeddings>\n",
+    ]
+    enforcement = _block(enforcement_context)
+    if enforcement:
+        parts += ["\n", enforcement]
+    return "".join(parts)
 
 
 # -------------------------------------------------------------------
 # OpenRouter call
 # -------------------------------------------------------------------
 
-def _call_openrouter_prompt_generator_sync(meta_prompt: str) -> str:
+def _call_openrouter_prompt_generator_sync(meta_prompt: str, n: int = 1) -> List[str]:
     """
     Synchronous helper that calls OpenRouter via the OpenAI client
-    to generate the final prompt text.
+    to generate the final prompt text (n candidates in one request).
 
     Uses the FREE_MODEL_ID (default: moonshotai/kimi-k2:free).
     """
+    return _call_openrouter_sync(SYSTEM_PROMPT, meta_prompt, n=n)
+
+
+def _choice_content(choice: Any) -> Optional[str]:
+    # Newer client: choice.message.content
+    message = getattr(choice, "message", None)
+    content = getattr(message, "content", None) if message is not None else None
+    if content:
+        return content
+
+    # Fallback if the response is dict-like
+    try:
+        return choice["message"]["content"]  # type: ignore[index]
+    except Exception:
+        return None
+
+
+def _call_openrouter_sync(system_prompt: str, user_prompt: str, n: int = 1) -> List[str]:
+    """
+    One chat completion against FREE_MODEL_ID; returns the text of every choice.
+
+    With n > 1 the candidates are sampled server-side from a single request,
+    so the shared prompt prefill is done once instead of once per candidate.
+    """
     if not OPENROUTER_API_KEY:
         raise RuntimeError("OPENROUTER_API_KEY is not set")
 
-    completion = openrouter_client.chat.completions.create(
+    kwargs: Dict[str, Any] = {}
+    if n > 1:
+        kwargs["n"] = n
+
+    completion = _openrouter_client().chat.completions.create(
         model=FREE_MODEL_ID,
         messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert prompt engineer. "
-                    "Given the meta-prompt, produce a single, ready-to-use prompt. "
-                    "Output only the final prompt text, with no explanations or commentary."
-                ),
-            },
-            {"role": "user", "content": meta_prompt},
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
         ],
         temperature=0.7,
+        **kwargs,
     )
 
     # Robust extraction to handle both object-style and dict-style responses
-    choice = completion.choices[0]
+    contents = [c for c in (_choice_content(ch) for ch in completion.choices) if c]
+    if not contents:  # pragma: no cover
+        raise RuntimeError(f"Unexpected OpenRouter response format: {completion}")
+    return contents
 
-    # Newer client: choice.message.content
-    message = getattr(choice, "message", None)
-    content = getattr(message, "content", None) if message is not None else None
-    if content:
-        return content
 
-    # Fallback if the response is dict-like
+def _stream_openrouter_sync(system_prompt: str, user_prompt: str) -> Iterator[str]:
+    """
+    Streaming variant of _call_openrouter_sync: yields content deltas as they
+    arrive. Closing the generator closes the HTTP stream.
+    """
+    if not OPENROUTER_API_KEY:
+        raise RuntimeError("OPENROUTER_API_KEY is not set")
+
+    stream = _openrouter_client().chat.completions.create(
+        model=FREE_MODEL_ID,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.7,
+        stream=True,
+    )
     try:
-        return choice["message"]["content"]  # type: ignore[index]
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError(f"Unexpected OpenRouter response format: {completion}") from exc
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = getattr(chunk.choices[0], "delta", None)
+            content = getattr(delta, "content", None) if delta is not None else None
+            if content:
+                yield content
+    finally:
+        stream.close()
+
+
+def _call_openrouter_streamed_sync(meta_prompt: str, max_words: int = PROMPT_MAX_WORDS) -> str:
+    """
+    Collect a streamed generation, stopping early once it runs past max_words.
+    """
+    chunks: List[str] = []
+    words = 0
+    stream = _stream_openrouter_sync(SYSTEM_PROMPT, meta_prompt)
+    try:
+        for content in stream:
+            chunks.append(content)
+            # approximate: a word split across two chunks counts twice
+            words += len(content.split())
+            if words > max_words:
+                break
+    finally:
+        stream.close()
 
+    text = "".join(chunks)
+    if not text:  # pragma: no cover
+        raise RuntimeError("Empty OpenRouter streaming response")
+    return text
+
+
+# -------------------------------------------------------------------
+# Response cache
+# -------------------------------------------------------------------
+
+# Only touched from the event loop, so no thread lock is needed. The per-key
+# asyncio locks collapse concurrent identical requests into one call; each
+# lock is kept with the number of callers holding or awaiting it, and is
+# dropped only when that count returns to zero.
+_PROMPT_CACHE: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+_PROMPT_CACHE_LOCKS: Dict[bytes, Tuple[asyncio.Lock, int]] = {}
+_PROMPT_CACHE_HITS = 0
+_PROMPT_CACHE_MISSES = 0
+
+
+def _meta_prompt_key(meta_prompt: str) -> bytes:
+    return hashlib.blake2b(meta_prompt.encode("utf-8"), digest_size=16).digest()
+
+
+def _prompt_cache_get(key: bytes) -> Optional[str]:
+    global _PROMPT_CACHE_HITS, _PROMPT_CACHE_MISSES
+    entry = _PROMPT_CACHE.get(key)
+    if entry is not None and time.monotonic() < entry[0]:
+        _PROMPT_CACHE.move_to_end(key)
+        _PROMPT_CACHE_HITS += 1
+        return entry[1]
+    if entry is not None:
+        del _PROMPT_CACHE[key]
+    _PROMPT_CACHE_MISSES += 1
+    return None
 
-async def call_openrouter_prompt_generator(meta_prompt: str) -> str:
+
+def _prompt_cache_set(key: bytes, text: str) -> None:
+    _PROMPT_CACHE[key] = (time.monotonic() + PROMPT_CACHE_TTL_SECONDS, text)
+    _PROMPT_CACHE.move_to_end(key)
+    while len(_PROMPT_CACHE) > PROMPT_CACHE_MAX_ITEMS:
+        _PROMPT_CACHE.popitem(last=False)
+
+
+def prompt_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the generated-prompt cache, for logging or metrics."""
+    lookups = _PROMPT_CACHE_HITS + _PROMPT_CACHE_MISSES
+    return {
+        "hits": _PROMPT_CACHE_HITS,
+        "misses": _PROMPT_CACHE_MISSES,
+        "hit_rate": _PROMPT_CACHE_HITS / lookups if lookups else 0.0,
+        "size": len(_PROMPT_CACHE),
+    }
+
+
+async def call_openrouter_prompt_generator(meta_prompt: str, bypass_cache: bool = False) -> str:
     """
     Async wrapper around the sync OpenAI client call.
 
-    Safe to use inside FastAPI endpoints or other async code.
+    Safe to use inside FastAPI endpoints or other async code. The completion
+    is streamed so overly long generations are cut off at PROMPT_MAX_WORDS.
+    Identical meta-prompts are served from the in-process cache unless
+    bypass_cache is set; the fresh result is cached either way.
+    """
+    if not PROMPT_CACHE_ENABLED:
+        return await cast(Any, anyio.to_thread).run_sync(_call_openrouter_streamed_sync, meta_prompt)
+
+    key = _meta_prompt_key(meta_prompt)
+    lock, refs = _PROMPT_CACHE_LOCKS.get(key) or (asyncio.Lock(), 0)
+    _PROMPT_CACHE_LOCKS[key] = (lock, refs + 1)
+    try:
+        async with lock:
+            if not bypass_cache:
+                cached = _prompt_cache_get(key)
+                if cached is not None:
+                    return cached
+            text = await cast(Any, anyio.to_thread).run_sync(_call_openrouter_streamed_sync, meta_prompt)
+            _prompt_cache_set(key, text)
+            return text
+    finally:
+        # lock.locked() is already False while waiters are still queued, so
+        # the refcount (not the lock state) decides when the entry can go
+        lock, refs = _PROMPT_CACHE_LOCKS[key]
+        if refs == 1:
+            del _PROMPT_CACHE_LOCKS[key]
+        else:
+            _PROMPT_CACHE_LOCKS[key] = (lock, refs - 1)
+
+
+async def stream_openrouter_prompt_generator(meta_prompt: str) -> AsyncIterator[str]:
+    """
+    Async iterator over the generated prompt's content deltas, e.g. for
+    forwarding to a client as server-sent events. Each chunk is pulled from
+    the sync stream in a worker thread.
+    """
+    stream = _stream_openrouter_sync(SYSTEM_PROMPT, meta_prompt)
+    done = object()
+    try:
+        while True:
+            content = await cast(Any, anyio.to_thread).run_sync(next, stream, done)
+            if content is done:
+                break
+            yield content
+    finally:
+        stream.close()
+
+
+async def call_openrouter_prompt_candidates(meta_prompt: str, n: int) -> List[str]:
+    """
+    Like call_openrouter_prompt_generator, but returns up to n candidate
+    prompts from a single request (OpenAI-style `n=` parameter).
     """
     # Cast anyio.to_thread to Any to satisfy type checkers that may not recognize
     # the run_sync attribute on the to_thread object in some environments.
-    return await cast(Any, anyio.to_thread).run_sync(_call_openrouter_prompt_generator_sync, meta_prompt)
+    return await cast(Any, anyio.to_thread).run_sync(_call_openrouter_prompt_generator_sync, meta_prompt, n)
+
+
+# -------------------------------------------------------------------
+# Batched OpenRouter call
+# -------------------------------------------------------------------
+
+_BATCH_INDEX_RE = re.compile(r"^\[(\d+)\][ \t]*", re.MULTILINE)
+
+
+def build_batched_meta_prompt(meta_prompts: Sequence[str]) -> str:
+    """
+    Pack several meta-prompts into one user message, each tagged with its
+    [index] position identifier so answers can be matched back.
+    """
+    return "\n\n".join(f"[{i}] {mp}" for i, mp in enumerate(meta_prompts))
+
+
+def split_batched_response(text: str, n: int) -> Dict[int, str]:
+    """
+    Split a batched answer on lines starting with [index].
+
+    Indices must appear in order ([0], [1], ...); an out-of-sequence "[k]"
+    line is treated as part of the current answer (generated prompts may
+    contain numbered references). Answers that can't be found are absent.
+    """
+    boundaries: List[re.Match] = []
+    for m in _BATCH_INDEX_RE.finditer(text):
+        if len(boundaries) < n and int(m.group(1)) == len(boundaries):
+            boundaries.append(m)
+
+    out: Dict[int, str] = {}
+    for i, m in enumerate(boundaries):
+        end = boundaries[i + 1].start() if i + 1 < len(boundaries) else len(text)
+        body = text[m.end():end].strip()
+        if body:
+            out[i] = body
+    return out
+
+
+async def call_openrouter_prompt_generator_batched(meta_prompts: Sequence[str]) -> List[str]:
+    """
+    Generate one prompt per meta-prompt using a single OpenRouter call.
+    Meta-prompts already in the prompt cache are answered from it and left
+    out of the batch. Any answer the model fails to return under its [index]
+    is retried with a regular single call, so the output always lines up
+    with the input.
+    """
+    if len(meta_prompts) == 1:
+        return [await call_openrouter_prompt_generator(meta_prompts[0])]
+
+    results: List[Optional[str]] = [None] * len(meta_prompts)
+    pending: List[int] = []
+    for i, mp in enumerate(meta_prompts):
+        cached = _prompt_cache_get(_meta_prompt_key(mp)) if PROMPT_CACHE_ENABLED else None
+        if cached is None:
+            pending.append(i)
+        else:
+            results[i] = cached
+
+    if len(pending) == 1:
+        results[pending[0]] = await call_openrouter_prompt_generator(meta_prompts[pending[0]], bypass_cache=True)
+    elif pending:
+        raw = await cast(Any, anyio.to_thread).run_sync(
+            _call_openrouter_sync,
+            BATCH_SYSTEM_PROMPT,
+            build_batched_meta_prompt([meta_prompts[i] for i in pending]),
+        )
+        parsed = split_batched_response(raw[0], len(pending))
+        for j, i in enumerate(pending):
+            text = parsed.get(j)
+            if text is None:
+                text = await call_openrouter_prompt_generator(meta_prompts[i], bypass_cache=True)
+            elif PROMPT_CACHE_ENABLED:
+                _prompt_cache_set(_meta_prompt_key(meta_prompts[i]), text)
+            results[i] = text
+
+    return cast(List[str], results)
 
 
 # -------------------------------------------------------------------
@@ -365,33 +727,144 @@ async def call_openrouter_prompt_generator(meta_prompt: str) -> str:
 
 
 
+# time_ns + a process-local counter: unique within the process and sortable
+_PROMPT_FILE_COUNTER = itertools.count()
+
+
+def _new_prompt_path() -> Path:
+    return PROMPT_OUTPUT_DIR / f"prompt_{time.time_ns()}_{next(_PROMPT_FILE_COUNTER)}.txt"
+
+
 def save_prompt_to_txt(prompt_text: str) -> str:
     """
     Save the prompt text into a timestamped .txt file under PROMPT_OUTPUT_DIR.
     Returns the absolute filesystem path.
     """
-    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"prompt_{ts}.txt"
-    path = PROMPT_OUTPUT_DIR / filename
+    path = _new_prompt_path()
     path.write_text(prompt_text, encoding="utf-8")
     return str(path)
 
 
+# -------------------------------------------------------------------
+# Background prompt writer
+# -------------------------------------------------------------------
+
+# Accepted prompts are written by one background task so the request path
+# never waits on disk. A path stays in _PENDING_WRITES until its file exists;
+# a failed write keeps its entry (with the error) so downloads can report it.
+class _PendingWrite:
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = asyncio.Event()
+        self.error: Optional[BaseException] = None
+
+
+_MAX_FAILED_WRITES = 256
+# upper bound on how long a download waits for its queued write
+_PROMPT_WRITE_TIMEOUT_SECONDS = float(os.getenv("PROMPT_WRITE_TIMEOUT_SECONDS", "30"))
+_WRITE_QUEUE: Optional[asyncio.Queue[Tuple[Path, str]]] = None
+_WRITER_TASK: Optional[asyncio.Task[None]] = None
+_PENDING_WRITES: Dict[Path, _PendingWrite] = {}
+_FAILED_WRITES: "OrderedDict[Path, None]" = OrderedDict()
+
+
+async def _prompt_writer() -> None:
+    assert _WRITE_QUEUE is not None
+    while True:
+        path, text = await _WRITE_QUEUE.get()
+        pending = _PENDING_WRITES.get(path)
+        try:
+            await anyio.to_thread.run_sync(path.write_text, text, "utf-8")
+        except Exception as e:
+            # anything (e.g. UnicodeEncodeError) is recorded, never fatal to the loop
+            logger.exception("failed to write prompt file %s", path)
+            if pending is not None:
+                pending.error = e
+                _FAILED_WRITES[path] = None
+                while len(_FAILED_WRITES) > _MAX_FAILED_WRITES:
+                    old, _ = _FAILED_WRITES.popitem(last=False)
+                    _PENDING_WRITES.pop(old, None)
+        else:
+            _PENDING_WRITES.pop(path, None)
+        finally:
+            if pending is not None:
+                pending.done.set()
+            _WRITE_QUEUE.task_done()
+
+
+def start_prompt_writer() -> None:
+    """Start the background writer; call from the app's startup hook."""
+    global _WRITE_QUEUE, _WRITER_TASK
+    if _WRITER_TASK is not None:
+        return
+    _WRITE_QUEUE = asyncio.Queue()
+    _WRITER_TASK = asyncio.create_task(_prompt_writer())
+
+
+async def stop_prompt_writer() -> None:
+    """Flush queued writes and stop the writer; call from the shutdown hook."""
+    global _WRITE_QUEUE, _WRITER_TASK
+    if _WRITER_TASK is None or _WRITE_QUEUE is None:
+        return
+    await _WRITE_QUEUE.join()
+    _WRITER_TASK.cancel()
+    try:
+        await _WRITER_TASK
+    except asyncio.CancelledError:
+        pass
+    _WRITE_QUEUE = None
+    _WRITER_TASK = None
+
+
+async def save_prompt_to_txt_async(prompt_text: str) -> str:
+    """
+    Like save_prompt_to_txt, but hands the write to the background writer and
+    returns the projected path immediately. Falls back to a worker-thread
+    write when the writer is not running (e.g. outside the FastAPI app).
+    """
+    if _WRITE_QUEUE is None:
+        return await anyio.to_thread.run_sync(save_prompt_to_txt, prompt_text)
+
+    path = _new_prompt_path()
+    _PENDING_WRITES[path] = _PendingWrite()
+    await _WRITE_QUEUE.put((path, prompt_text))
+    return str(path)
+
+
+async def wait_for_prompt_write(path: Path) -> None:
+    """
+    Wait until a queued write for `path` (if any) has hit the disk.
+    Raises OSError if the background writer failed to write it, is no longer
+    running, or does not get to it within _PROMPT_WRITE_TIMEOUT_SECONDS.
+    """
+    pending = _PENDING_WRITES.get(path)
+    if pending is None:
+        return
+    if not pending.done.is_set() and (_WRITER_TASK is None or _WRITER_TASK.done()):
+        raise OSError(f"prompt writer is not running; {path.name} was not written")
+    try:
+        await asyncio.wait_for(pending.done.wait(), _PROMPT_WRITE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise OSError(f"timed out waiting to write {path.name}") from None
+    if pending.error is not None:
+        raise OSError(f"failed to write {path.name}") from pending.error
+
+
 # -------------------------------------------------------------------
 # High-level orchestrator
 # -------------------------------------------------------------------
 
-async def generate_prompt_from_patterns(
-    tags: List[TagIn],
-    pattern_names: List[str],
-    min_score: float = MIN_PROMPT_SCORE,
-) -> PromptResult:
+def build_meta_prompt(tags: List[TagIn], pattern_names: List[str]) -> str:
+    """
+    Validate one (tags, pattern_names) job and assemble its meta-prompt.
+    """
     if not tags:
         raise ValueError("At least one tag is required")
     if not pattern_names:
         raise ValueError("At least one pattern name is required")
 
-    tag_context = build_tag_context(tags)
+    tag_map, tag_context = _process_tags(tags)
     pattern_rows = get_patterns_by_name(pattern_names)
     if not pattern_rows:
         raise ValueError("No patterns found for the given names")
@@ -399,19 +872,21 @@ async def generate_prompt_from_patterns(
     pattern_context = build_pattern_context(pattern_rows)
 
     # NEW: enforcement derived from CSV + tags
-    enforcement_context = build_enforcement_context(pattern_rows, tags)
+    enforcement_context = build_enforcement_context(pattern_rows, tag_map)
 
-    meta_prompt = build_prompt_generator_instruction(
+    return build_prompt_generator_instruction(
         tag_context=tag_context,
         pattern_context=pattern_context,
         enforcement_context=enforcement_context,  # NEW
     )
 
-    prompt_text = await call_openrouter_prompt_generator(meta_prompt)
-    score = score_generated_prompt(prompt_text)
+
+async def _finalize_prompt(prompt_text: str, min_score: float, score: Optional[float] = None) -> PromptResult:
+    if score is None:
+        score = await cast(Any, anyio.to_thread).run_sync(score_generated_prompt, prompt_text)
 
     if score >= min_score:
-        file_path = save_prompt_to_txt(prompt_text)
+        file_path = await save_prompt_to_txt_async(prompt_text)
         accepted = True
     else:
         file_path = None
@@ -425,3 +900,48 @@ async def generate_prompt_from_patterns(
     )
 
 
+async def generate_prompts_batched(
+    jobs: Sequence[Tuple[List[TagIn], List[str]]],
+    batch_size: int = PROMPT_BATCH_SIZE,
+    min_score: float = MIN_PROMPT_SCORE,
+) -> List[PromptResult]:
+    """
+    Generate prompts for many (tags, pattern_names) jobs, packing up to
+    batch_size meta-prompts into each OpenRouter call. Results are returned
+    in job order. All jobs are validated before any network call is made.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    meta_prompts = [build_meta_prompt(tags, names) for tags, names in jobs]
+
+    results: List[PromptResult] = []
+    for start in range(0, len(meta_prompts), batch_size):
+        texts = await call_openrouter_prompt_generator_batched(meta_prompts[start:start + batch_size])
+        for t in texts:
+            results.append(await _finalize_prompt(t, min_score))
+    return results
+
+
+async def generate_prompt_from_patterns(
+    tags: List[TagIn],
+    pattern_names: List[str],
+    min_score: float = MIN_PROMPT_SCORE,
+    num_candidates: int = 1,
+) -> PromptResult:
+    """
+    Generate, score and (if accepted) save one prompt.
+
+    With num_candidates > 1, that many candidates are sampled in a single
+    OpenRouter request (`n=`) and the best-scoring one is kept.
+    """
+    if num_candidates > 1:
+        meta_prompt = build_meta_prompt(tags, pattern_names)
+        candidates = await call_openrouter_prompt_candidates(meta_prompt, num_candidates)
+        scores = await cast(Any, anyio.to_thread).run_sync(score_generated_prompts, candidates)
+        scored = list(zip(scores, candidates))
+        best_score, best_text = max(scored, key=lambda sc: sc[0])
+        return await _finalize_prompt(best_text, min_score, score=best_score)
+
+    results = await generate_prompts_batched([(tags, pattern_names)], batch_size=1, min_score=min_score)
+    return results[0]
@@ -1,5 +1,67 @@
 import re
-from typing import Final
+from typing import Final, Iterable, List
+
+
+# All literal/regex features are found in ONE scan of the lowercased text.
+# Every alternative sits inside a lookahead so matches may overlap (e.g.
+# "act as a prompt engineer" hits both "act as" and "as a prompt engineer").
+# No two alternatives can match at the same position except where noted,
+# so the first-alternative-wins rule of "|" never hides a feature.
+_FEATURES_RE: Final = re.compile(
+    r"(?=(?:"
+    r"(?P<numbered>^\s*\d+\.)"
+    # substring checks; \b-bounded variants are derived in _bounded()
+    r"|(?P<you_are>you are)"
+    r"|(?P<act_as>act as)"
+    r"|(?P<context_colon>context:)"
+    r"|(?P<background_colon>background:)"
+    r"|(?P<role>\byour role\b|\brole:\b)"
+    r"|(?P<task>\btask:\b|\bgoal:\b|\bobjective:\b)"
+    r"|(?P<format>\bformat\b|\bstructured\b|\bsections?\b|\bheadings?\b)"
+    r"|(?P<output_kind>\bjson\b|\btable\b|\bbullet points?\b|\bmarkdown\b)"
+    r"|(?P<steps>\bnumbered steps\b|\bstep[- ]by[- ]step\b)"
+    r"|(?P<input>\binput:\b)"
+    r"|(?P<constraints>\bconstraints?:\b|\brules:\b|\bguidelines:\b)"
+    r"|(?P<curly_var>\{[a-z0-9_]+\})"
+    r"|(?P<angle_var><[a-z0-9_ ]+>)"
+    # "do not"/"don't" set neg; the "do" of "do not" also counts as a "do"
+    r"|(?P<do>\bdo(?:(?P<neg> not|n't)\b|\b))"
+    r"|(?P<prompt_engineer>as a prompt engineer)"
+    r"|(?P<this_prompt>in this prompt|this prompt should)"
+    r"|(?P<etc>etc\.)"
+    r"|(?P<so_on>and so on)"
+    r"|(?P<output>output:|return|produce)"
+    r"))",
+    re.MULTILINE,
+)
+_WORD_CHAR: Final = re.compile(r"\w")
+
+_ACTION_VERBS: Final = frozenset([
+    "act", "analyze", "categorize", "classify", "contrast", "compare",
+    "create", "describe", "define", "evaluate", "extract", "find",
+    "generate", "identify", "list", "organize", "parse", "predict",
+    "provide", "rank", "recommend", "return", "retrieve", "rewrite",
+    "select", "show", "sort", "summarize", "translate", "write"
+])
+_TOKEN_PUNCT: Final = ".,:;!?"
+
+# Outside this token range a prompt is scored by length alone
+_MIN_SCANNED_TOKENS: Final = 20
+_MAX_SCANNED_TOKENS: Final = 2000
+
+
+def _is_word(text: str, i: int) -> bool:
+    return 0 <= i < len(text) and _WORD_CHAR.match(text, i) is not None
+
+
+def _bounded(text: str, start: int, end: int, word_after: bool = False) -> bool:
+    """
+    Emulate \b<literal>\b for a match of a literal at [start, end).
+    word_after: literal ends in a non-word char (":"), so \b needs a word char next.
+    """
+    if start > 0 and _is_word(text, start - 1):
+        return False
+    return _is_word(text, end) if word_after else not _is_word(text, end)
 
 
 def score_generated_prompt(text: str) -> float:
@@ -23,8 +85,8 @@ def score_generated_prompt(text: str) -> float:
     raw = text or ""
     stripped = raw.strip()
     lower = stripped.lower()
-    tokens = stripped.split()
-    n_tokens = len(tokens)
+    lower_tokens = lower.split()
+    n_tokens = len(lower_tokens)
 
     # start from a baseline; we will add/subtract around this
     score: float = 0.5
@@ -34,6 +96,13 @@ def score_generated_prompt(text: str) -> float:
     if n_tokens == 0:
         return 0.0
 
+    # degenerate outputs (truncated / runaway generations) get a fixed low
+    # score without running the feature scan
+    if n_tokens < _MIN_SCANNED_TOKENS:
+        return 0.25
+    if n_tokens > _MAX_SCANNED_TOKENS:
+        return 0.1
+
     if n_tokens < 40:
         score -= 0.25
     elif 40 <= n_tokens <= 400:
@@ -41,58 +110,82 @@ def score_generated_prompt(text: str) -> float:
     elif n_tokens > 600:
         score -= 0.25
 
+    # --------- single pass: collect every literal/regex feature ----------
+    seen = set()
+    do_count = 0
+    do_not_count = 0
+    etc_count = 0
+    numbered_lines = 0
+    numbered_end = 0  # findall semantics: numbered matches must not overlap
+    you_are_bounded = act_as_bounded = context_bounded = False
+
+    for m in _FEATURES_RE.finditer(lower):
+        kind = m.lastgroup  # outermost named group, never "neg"
+        start = m.start()
+        end = m.end(kind)
+        if kind == "do":
+            neg = m.group("neg")
+            if neg is None or neg == " not":
+                do_count += 1
+            if neg is not None:
+                do_not_count += 1
+        elif kind == "etc":
+            etc_count += 1
+        elif kind == "numbered":
+            if start >= numbered_end:
+                numbered_lines += 1
+                numbered_end = end
+        elif kind == "you_are":
+            you_are_bounded = you_are_bounded or _bounded(lower, start, end)
+        elif kind == "act_as":
+            act_as_bounded = act_as_bounded or _bounded(lower, start, end)
+        elif kind in ("context_colon", "background_colon"):
+            context_bounded = context_bounded or _bounded(lower, start, end, word_after=True)
+        seen.add(kind)
+
     # --------- 2. explicit role / task / goal  ----------
     # good prompts set context and goal clearly.
-    if re.search(r"\byou are\b", lower):
+    if you_are_bounded:
         score += 0.15
-    if re.search(r"\byour role\b|\bact as\b|\brole:\b", lower):
+    if "role" in seen or act_as_bounded:
         score += 0.1
-    if re.search(r"\btask:\b|\bgoal:\b|\bobjective:\b", lower):
+    if "task" in seen:
         score += 0.1
 
     # --------- 3. strong action verbs & specific output instructions ----------
     # Based on "use verbs that describe the action" and "be specific about the output".
-    ACTION_VERBS: Final = [
-        "act", "analyze", "categorize", "classify", "contrast", "compare",
-        "create", "describe", "define", "evaluate", "extract", "find",
-        "generate", "identify", "list", "organize", "parse", "predict",
-        "provide", "rank", "recommend", "return", "retrieve", "rewrite",
-        "select", "show", "sort", "summarize", "translate", "write"
-    ]
     # Check if at least one of these appears near the beginning (first ~30 tokens)
-    first_slice = " ".join(tokens[:30]).lower()
-    action_hits = sum(1 for v in ACTION_VERBS if v in first_slice)
+    first_tokens = {t.strip(_TOKEN_PUNCT) for t in lower_tokens[:30]}
+    action_hits = len(_ACTION_VERBS & first_tokens)
     if action_hits >= 1:
         score += 0.1
     if action_hits >= 3:
         score += 0.05  # prompt is clearly "doing something"
 
     # "Be specific about the output"
-    if re.search(r"\bformat\b|\bstructured\b|\bsections?\b|\bheadings?\b", lower):
+    if "format" in seen:
         score += 0.1
-    if re.search(r"\bjson\b|\btable\b|\bbullet points?\b|\bmarkdown\b", lower):
+    if "output_kind" in seen:
         score += 0.1
-    if re.search(r"\bnumbered steps\b|\bstep[- ]by[- ]step\b", lower):
+    if "steps" in seen:
         score += 0.1
 
     # --------- 4. context / input / constraints sections ----------
     # Good prompts usually separate context, input, constraints.
-    if re.search(r"\bcontext:\b|\bbackground:\b|\binput:\b", lower):
+    if context_bounded or "input" in seen:
         score += 0.1
-    if re.search(r"\bconstraints?:\b|\brules:\b|\bguidelines:\b", lower):
+    if "constraints" in seen:
         score += 0.05
 
     # --------- 5. variables / placeholders (parameters) ----------
     # Using variables/slots (e.g., {topic}) is considered a best practice.
-    if re.search(r"\{[a-z0-9_]+\}", stripped, flags=re.IGNORECASE):
+    if "curly_var" in seen:
         score += 0.1
-    if re.search(r"<[a-z0-9_ ]+>", stripped, flags=re.IGNORECASE):
+    if "angle_var" in seen:
         score += 0.05
 
     # --------- 6. preference for positive instructions over "do not" ----------
     # The whitepaper recommends instructions > constraints.
-    do_count = len(re.findall(r"\bdo\b", lower))
-    do_not_count = len(re.findall(r"\bdo not\b|\bdon't\b", lower))
     if do_count > 0:
         score += 0.05  # at least some explicit "do" instruction
 
@@ -104,29 +197,27 @@ def score_generated_prompt(text: str) -> float:
 
     # --------- 7. structural cues from pattern-style prompts ----------
     # Prompts that look like pattern-based instructions (multiple numbered requirements).
-    numbered_lines = len(re.findall(r"^\s*\d+\.", stripped, flags=re.MULTILINE))
     if numbered_lines >= 3:
         score += 0.1
 
     # --------- 8. penalties for meta-talk and vagueness ----------
     # Meta-talk about "this prompt" etc. usually indicates leakage from the tool.
-    if "as a prompt engineer" in lower:
+    if "prompt_engineer" in seen:
         score -= 0.3
-    if "in this prompt" in lower or "this prompt should" in lower:
+    if "this_prompt" in seen:
         score -= 0.2
 
     # Overuse of vague "etc." and "and so on" is a signal of under-specification
-    etc_count = lower.count("etc.")
     if etc_count >= 2:
         score -= 0.1
-    if "and so on" in lower:
+    if "so_on" in seen:
         score -= 0.05
 
     # --------- 9. mild reward if it looks like a pattern-based design ----------
     # e.g., mentions of role, context, constraints and output all together
-    has_role = "you are" in lower or "act as" in lower
-    has_context = "context:" in lower or "background:" in lower
-    has_output = "output:" in lower or "return" in lower or "produce" in lower
+    has_role = "you_are" in seen or "act_as" in seen
+    has_context = "context_colon" in seen or "background_colon" in seen
+    has_output = "output" in seen
     if has_role and has_context and has_output:
         score += 0.15
 
@@ -136,3 +227,13 @@ def score_generated_prompt(text: str) -> float:
     if score > 1.0:
         score = 1.0
     return score
+
+
+def score_generated_prompts(texts: Iterable[str]) -> List[float]:
+    """
+    Score several prompts (e.g. the n= candidates of one request).
+
+    Runs serially: `re` holds the GIL while matching, so a thread pool would
+    only add overhead. The compiled patterns are shared across all texts.
+    """
+    return [score_generated_prompt(t) for t in texts]
@@ -1,7 +1,10 @@
 # api/schemas.py
 
-from pydantic import BaseModel
-from typing import Optional, Literal
+import re
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from enum import IntEnum
+from typing import Any, Dict, Literal, get_args
 
 # Match your TaskType definition
 TaskType = Literal[
@@ -13,20 +16,78 @@ TaskType = Literal[
 ]
 
 
+
+
+class TaskTypeId(IntEnum):
+    """Integer ids for TaskType, in declaration order, for table dispatch."""
+    SHORT_SUMMARY = 0
+    LONG_SUMMARY = 1
+    RESEARCH_SUMMARY = 2
+    MATH_PROOF = 3
+    PROMPT_DRAFT = 4
+
+
+_TASK_ID: Dict[str, TaskTypeId] = {t: TaskTypeId(i) for i, t in enumerate(get_args(TaskType))}
+
+
+# Control sequences rejected in free-text request fields: chat-template
+# special tokens (<|...|>) and template expressions ({{ ... }}).
+_DISALLOWED_TEXT_RE = re.compile(r"<\|.*?\|>|\{\{.*?\}\}", re.DOTALL)
+
+
+# Plain data carriers: immutable, and unknown fields are rejected
+_SCHEMA_CONFIG = ConfigDict(frozen=True, extra="forbid")
+
+
 class UploadResponse(BaseModel):
+    model_config = _SCHEMA_CONFIG
+
     document_id: int
     title: str
     filename: str
 
 
 class GenerateRequest(BaseModel):
+    model_config = _SCHEMA_CONFIG
+
     document_id: int
     task_type: TaskType
-    output_format: Optional[str] = None
-    extra_instructions: Optional[str] = None
+    # "" means "not given"; an explicit null from the client maps to "" too
+    output_format: str = ""
+    extra_instructions: str = ""
+
+    @field_validator("output_format", "extra_instructions", mode="before")
+    @classmethod
+    def _null_as_empty(cls, v: Any) -> Any:
+        return "" if v is None else v
+
+    @field_validator("output_format", "extra_instructions")
+    @classmethod
+    def _reject_control_sequences(cls, v: str) -> str:
+        if v and _DISALLOWED_TEXT_RE.search(v):
+            raise ValueError("contains a disallowed control sequence")
+        return v
+
+    @property
+    def task_id(self) -> TaskTypeId:
+        return _TASK_ID[self.task_type]
 
 
 class GenerateResponse(BaseModel):
+    model_config = _SCHEMA_CONFIG
+
     job_id: int
     download_url: str
     result_preview: str
+
+
+_GENERATE_REQUEST_ADAPTER = TypeAdapter(GenerateRequest)
+
+
+def parse_generate_request(payload: bytes) -> GenerateRequest:
+    """
+    Validate a raw JSON body straight into a GenerateRequest with
+    pydantic-core's JSON parser (no intermediate dict).
+    Raises pydantic.ValidationError on bad input.
+    """
+    return _GENERATE_REQUEST_ADAPTER.validate_json(payload)
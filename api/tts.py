@@ -2,21 +2,26 @@
 
 import os
 import re
-import uuid
-import tempfile
-from typing import List, Optional, Tuple, cast
+import secrets
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
 from time import monotonic
 from io import BytesIO
 import asyncio
+import hashlib
+import importlib.util
 import logging
 
 import httpx
-from pydub import AudioSegment
-from pydub.utils import which
-import PyPDF2
+from pypdf import PdfReader
+try:
+    # PyMuPDF (C/MuPDF core) is much faster than pypdf; optional so plain installs still work
+    import pymupdf as fitz
+except ImportError:
+    fitz = None
 from dotenv import load_dotenv
 from pathlib import Path
-from elevenlabs.client import ElevenLabs
 
 load_dotenv()
 
@@ -28,32 +33,53 @@ logger = logging.getLogger("tts")
 ELEVEN_API_KEY = os.environ.get("ELEVEN_API_KEY", "")
 VOICE_ID = os.environ.get("ELEVEN_VOICE_ID", "EXAVITQu4vr4xnSDxMaL")  # replace with yours
 MODEL_ID = os.environ.get("ELEVEN_MODEL_ID", "eleven_multilingual_v2")  # replace if needed
-MAX_CHARS = int(os.environ.get("TTS_MAX_CHARS", "2000"))  # bigger than 250 -> fewer calls
-CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "4"))  # tune based on CPU/network
-
-# === ffmpeg for pydub ===
-ffmpeg_path = which("ffmpeg") or r"C:\ffmpeg\bin\ffmpeg.exe"
-ffprobe_path = which("ffprobe") or r"C:\ffmpeg\bin\ffprobe.exe"
-os.environ["FFMPEG_BINARY"] = ffmpeg_path
-os.environ["FFPROBE_BINARY"] = ffprobe_path
+# Per-request character limits of the ElevenLabs models (5000 assumed for others)
+_MODEL_MAX_CHARS = {
+    "eleven_multilingual_v2": 10_000,
+    "eleven_turbo_v2": 30_000,
+    "eleven_flash_v2": 30_000,
+    "eleven_turbo_v2_5": 40_000,
+    "eleven_flash_v2_5": 40_000,
+}
+# bigger -> fewer calls (each one a full round trip); never above the model's limit
+MAX_CHARS = min(
+    int(os.environ.get("TTS_MAX_CHARS", "4500")),
+    _MODEL_MAX_CHARS.get(MODEL_ID, 5_000),
+)
+CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "4"))  # starting point; adapts at runtime
+MAX_CONCURRENCY = int(os.environ.get("TTS_MAX_CONCURRENCY", "32"))  # ceiling for the adaptive limit
+TTS_TIMEOUT_SECONDS = float(os.environ.get("TTS_TIMEOUT_SECONDS", "60"))
+# HTTP/2 lets concurrent chunks share one connection; needs the h2 package
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+# On-disk cache of synthesized chunks, keyed by (voice, model, text)
+TTS_CACHE_ENABLED = os.environ.get("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_MAX_FILES = int(os.environ.get("TTS_CACHE_MAX_FILES", "2048"))
 
 BASE_DIR = Path(__file__).parent
 AUDIO_DIR = BASE_DIR / "audio"
 AUDIO_DIR.mkdir(exist_ok=True)
-
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
+TTS_CACHE_DIR = AUDIO_DIR / "cache"
+TTS_CACHE_DIR.mkdir(exist_ok=True)
 
 # ==== TEXT UTILITIES (all O(n)) ====
 _SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# One pass for all three cleanups; group 1 is set only for a hyphenated
+# line break, which is dropped (everything else collapses to one space)
+_CLEANUP = re.compile(
+    r"(-\s*\n\s*)"   # join hyphenated line breaks
+    r"|\s*\n\s*"     # newlines -> space
+    r"|\s{2,}"        # collapse whitespace
+)
+
+
+def _cleanup_repl(m: "re.Match[str]") -> str:
+    return "" if m.group(1) else " "
 
 
 def cleanup_text(raw: str) -> str:
     if not raw:
         return ""
-    txt = re.sub(r"-\s*\n\s*", "", raw)   # join hyphenated line breaks
-    txt = re.sub(r"\s*\n\s*", " ", txt)   # newlines -> space
-    txt = re.sub(r"\s{2,}", " ", txt)     # collapse whitespace
-    return txt.strip()
+    return _CLEANUP.sub(_cleanup_repl, raw).strip()
 
 
 def sentences(text: str) -> List[str]:
@@ -64,30 +90,55 @@ def sentences(text: str) -> List[str]:
     return [s.strip() for s in sents if s.strip()]
 
 
+def _wrap_words(text: str, limit: int, chunks: List[str]) -> str:
+    """Greedy word-wrap; full lines go to chunks, the partial last line is returned."""
+    cur = ""
+    for w in text.split():
+        if not cur:
+            cur = w
+        elif len(cur) + 1 + len(w) <= limit:
+            cur += " " + w
+        else:
+            chunks.append(cur)
+            cur = w
+    return cur
+
+
 def pack_sentences(sents: List[str], limit: int) -> List[str]:
-    """Greedy pack sentences into chunks <= limit chars (linear time)."""
+    """
+    Greedy pack sentences into chunks <= limit chars.
+    Chunk boundaries come from a bisect over prefix sums of the joined
+    lengths, so each chunk costs one C-level search instead of one Python
+    step per sentence. A sentence longer than limit is word-wrapped.
+    """
+    n = len(sents)
+    # Typical page: everything fits in one chunk, no boundaries to find
+    if n and sum(map(len, sents)) + n - 1 <= limit:
+        return [" ".join(sents)]
+    # ends[k] = length of " ".join(sents[:k]) + 1, i.e. sum of len(s) + 1
+    ends = [0, *accumulate(len(s) + 1 for s in sents)]
     chunks: List[str] = []
     cur = ""
-    for s in sents:
+    i = 0
+    while i < n:
         if not cur:
-            cur = s
-        elif len(cur) + 1 + len(s) <= limit:
-            cur += " " + s
+            if ends[i + 1] - ends[i] - 1 > limit:
+                cur = _wrap_words(sents[i], limit, chunks)
+                i += 1
+                continue
+            # largest j with len(" ".join(sents[i:j])) <= limit
+            j = bisect_right(ends, ends[i] + limit + 1, i + 1) - 1
+            cur = " ".join(sents[i:j])
         else:
-            chunks.append(cur)
-            cur = s
-        # If a single sentence is longer than limit, fall back to word-wrap split
-        if len(cur) > limit:
-            words = cur.split()
-            cur = ""
-            for w in words:
-                if not cur:
-                    cur = w
-                elif len(cur) + 1 + len(w) <= limit:
-                    cur += " " + w
-                else:
-                    chunks.append(cur)
-                    cur = w
+            # largest j with len(cur + " " + " ".join(sents[i:j])) <= limit
+            # (cur can itself exceed limit: a single over-long word)
+            j = max(i, bisect_right(ends, ends[i] + limit - len(cur), i) - 1)
+            if j > i:
+                cur = " ".join((cur, *sents[i:j]))
+            if j < n:
+                chunks.append(cur)
+                cur = ""
+        i = j
     if cur:
         chunks.append(cur)
     return chunks
@@ -109,102 +160,382 @@ HEADERS = {
     "Content-Type": "application/json",
 }
 
+# Shared HTTP client (connection pooling, HTTP/2 multiplexing across chunks)
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            headers=HEADERS,
+            timeout=TTS_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENCY * 2,
+                max_keepalive_connections=MAX_CONCURRENCY,
+            ),
+        )
+    return _HTTP_CLIENT
+
+
+async def close_tts_client() -> None:
+    """
+    Call this on shutdown if you want clean closing.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT and not _HTTP_CLIENT.is_closed:
+        await _HTTP_CLIENT.aclose()
+    _HTTP_CLIENT = None
+
+
+# Adaptive concurrency, TCP-style (AIMD): the limit grows by one after a
+# full window of successes and is cut by _OVERLOAD_DECREASE on an overload
+# response; the overloaded chunk is retried after a short backoff.
+_OVERLOAD_STATUS = (429, 503)
+_OVERLOAD_DECREASE = 0.1
+_OVERLOAD_RETRIES = 3
+_OVERLOAD_BACKOFF_SECONDS = 1.0
+
+
+def _is_overload(exc: BaseException) -> bool:
+    """True for ElevenLabs rate-limit / overload responses, SDK or httpx errors."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status in _OVERLOAD_STATUS
+
+
+class AdmissionController:
+    """
+    A semaphore whose limit can change while callers are waiting.
+    Additive increase: +1 after `limit` successes in a row, up to `ceiling`.
+    Multiplicative decrease: x(1 - _OVERLOAD_DECREASE), at least -1, on overload.
+    """
+
+    def __init__(self, limit: int, ceiling: Optional[int] = None):
+        self._cond = asyncio.Condition()
+        self._in_flight = 0
+        self._limit = max(1, limit)
+        self._ceiling = max(self._limit, ceiling or limit)
+        self._streak = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify(1)
+
+    async def set_limit(self, limit: int) -> None:
+        async with self._cond:
+            limit = min(max(1, limit), self._ceiling)
+            grown = limit - self._limit
+            self._limit = limit
+            if grown > 0:
+                self._cond.notify(grown)
+
+    async def on_success(self) -> None:
+        self._streak += 1
+        if self._streak >= self._limit and self._limit < self._ceiling:
+            self._streak = 0
+            await self.set_limit(self._limit + 1)
+
+    async def on_overload(self) -> None:
+        self._streak = 0
+        await self.set_limit(min(self._limit - 1, int(self._limit * (1 - _OVERLOAD_DECREASE))))
+        logger.warning("eleven: overloaded, concurrency limit now %d", self._limit)
+
+    async def __aenter__(self) -> "AdmissionController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+
+# One controller for the whole process, so concurrent jobs (and every page of
+# a PDF job) share a single cap on in-flight ElevenLabs calls, and what it
+# learns about rate limits carries over between requests.
+_ADMISSION: Optional[AdmissionController] = None
+_ADMISSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_admission() -> AdmissionController:
+    """The shared AdmissionController, created on first use in the running loop."""
+    global _ADMISSION, _ADMISSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _ADMISSION is None or _ADMISSION_LOOP is not loop:
+        _ADMISSION = AdmissionController(CONCURRENCY, ceiling=MAX_CONCURRENCY)
+        _ADMISSION_LOOP = loop
+    return _ADMISSION
+
 
 async def tts_request(text: str) -> bytes:
     """
     Single TTS call to ElevenLabs; returns MP3 bytes.
-    Uses the official ElevenLabs Python client under the hood.
+    Plain REST call over the shared pooled client.
     """
     if not ELEVEN_API_KEY:
         raise RuntimeError("Missing ELEVEN_API_KEY")
 
-    def _call() -> bytes:
-        # Raw response so we can access headers if needed
-        # NOTE: pass voice settings via the SDK model if needed; omit untyped dict to satisfy the
-        # typed client signature (VoiceSettings | None).
-        with client.text_to_speech.with_raw_response.convert(
-            text=text,
-            voice_id=VOICE_ID,
-            model_id=MODEL_ID,
-        ) as response:
-            # Example: character usage if you want to log/monitor:
-            char_cost = response.headers.get("x-character-count")
-            logger.debug("ElevenLabs char cost: %s", char_cost)
-            data = response.data
-            # If the SDK returns raw bytes, just return them; if it returns an iterator of byte chunks,
-            # join them into a single bytes object so the function signature is respected.
-            if isinstance(data, (bytes, bytearray)):
-                return bytes(data)
-            try:
-                return b"".join(data)
-            except TypeError:
-                # Fallback: iterate and accumulate into a BytesIO buffer
-                buf = BytesIO()
-                for chunk in data:
-                    buf.write(chunk)
-                return buf.getvalue()
-
-    # Run the blocking ElevenLabs client call in a thread to keep async API
-    return await asyncio.to_thread(_call)
-
-# from elevenlabs.client import ElevenLabs
-# client = ElevenLabs(api_key="your_api_key")
-# # Get raw response with headers
-# response = client.text_to_speech.with_raw_response.convert(
-#     text="Hello, world!",
-#     voice_id="voice_id"
-# )
-# # Access character cost from headers
-# char_cost = response.headers.get("x-character-count")
-# audio_data = response.data
-    
+    response = await _get_http_client().post(
+        ELEVEN_URL.format(voice_id=VOICE_ID),
+        json={"text": text, "model_id": MODEL_ID},
+    )
+    response.raise_for_status()
+    # Example: character usage if you want to log/monitor:
+    char_cost = response.headers.get("x-character-count")
+    logger.debug("ElevenLabs char cost: %s", char_cost)
+    return response.content
 
 
-async def text_to_audio_eleven(text: str, out_path: Optional[str] = None) -> str:
+# ==== CHUNK CACHE ====
+# One MP3 per chunk under TTS_CACHE_DIR, named by a BLAKE2b-128 of the
+# voice, model and text. Hits touch the file's mtime, and every
+# _CACHE_PRUNE_EVERY writes the least recently used files beyond
+# TTS_CACHE_MAX_FILES are deleted.
+_CACHE_PRUNE_EVERY = 64
+_cache_writes = 0
+
+
+def _cache_path(text: str) -> Path:
+    key = f"{VOICE_ID}\0{MODEL_ID}\0{text}".encode("utf-8")
+    return TTS_CACHE_DIR / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.mp3"
+
+
+def _cache_read(path: Path) -> Optional[bytes]:
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass  # evicted between read and touch; the bytes are still good
+    return data
+
+
+def _cache_write(path: Path, data: bytes) -> None:
+    # write-then-rename so concurrent readers never see a partial file
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{secrets.token_hex(8)}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _cache_prune() -> None:
+    entries = []
+    with os.scandir(TTS_CACHE_DIR) as it:
+        for e in it:
+            if e.name.endswith(".mp3"):
+                try:
+                    entries.append((e.stat().st_mtime, e.path))
+                except FileNotFoundError:
+                    pass
+    if len(entries) <= TTS_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    for _, path in entries[: len(entries) - TTS_CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def _cache_store(path: Path, data: bytes) -> None:
+    global _cache_writes
+    try:
+        await asyncio.to_thread(_cache_write, path, data)
+        _cache_writes += 1
+        if _cache_writes % _CACHE_PRUNE_EVERY == 0:
+            await asyncio.to_thread(_cache_prune)
+    except OSError:
+        logger.warning("eleven: could not write TTS cache entry %s", path.name, exc_info=True)
+
+
+async def tts_request_adaptive(text: str, admission: AdmissionController) -> bytes:
     """
-    Chunk text (smart), TTS concurrently, concat once, write MP3.
-    Returns the output file path.
+    tts_request under `admission`, feeding it success/overload signals.
+    Chunks already synthesized (same voice, model and text) come from the
+    disk cache without taking an admission slot.
+    Overloaded calls are retried with exponential backoff (outside the
+    admission slot); any other error is raised as-is.
     """
+    cache_path = _cache_path(text) if TTS_CACHE_ENABLED else None
+    if cache_path is not None:
+        cached = await asyncio.to_thread(_cache_read, cache_path)
+        if cached is not None:
+            logger.debug("eleven: cache hit %s", cache_path.name)
+            return cached
+
+    for attempt in range(_OVERLOAD_RETRIES + 1):
+        async with admission:
+            try:
+                audio = await tts_request(text)
+            except Exception as e:
+                if not _is_overload(e) or attempt == _OVERLOAD_RETRIES:
+                    raise
+                await admission.on_overload()
+            else:
+                await admission.on_success()
+                break
+        await asyncio.sleep(_OVERLOAD_BACKOFF_SECONDS * 2 ** attempt)
+    else:
+        raise AssertionError("unreachable")
+
+    # after the slot is released: the write (and an occasional prune) is disk work
+    if cache_path is not None:
+        await _cache_store(cache_path, audio)
+    return audio
+
+
+# ==== MP3 CONCATENATION ====
+# MP3 is a sequence of self-contained frames, so clips with the same
+# encoding settings (every ElevenLabs chunk uses the same voice/model output
+# format) can be joined byte-for-byte, without decoding and re-encoding.
+# Only the first clip keeps its leading ID3v2 tag.
+
+
+def _id3_size(data: bytes) -> int:
+    """Length of a leading ID3v2 tag (header + body + footer), or 0."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    # synchsafe integer: 4 bytes, 7 significant bits each
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def join_mp3(blobs: List[bytes]) -> bytes:
+    """Concatenate MP3 clips, dropping the ID3v2 tag of all but the first."""
+    if len(blobs) == 1:
+        return blobs[0]  # nothing to join; don't copy
+    parts = [memoryview(b)[_id3_size(b) if i else 0:] for i, b in enumerate(blobs)]
+    return b"".join(parts)
+
+
+def _start_chunk_tasks(text: str) -> List["asyncio.Task[bytes]"]:
+    """Chunk text (smart) and start one TTS task per chunk, in chunk order."""
     chunks = chunk_text_for_tts(text, limit=MAX_CHARS)
-    logger.info("eleven: chunks=%d limit=%d concurrency=%d", len(chunks), MAX_CHARS, CONCURRENCY)
+    admission = _get_admission()
+    logger.info("eleven: chunks=%d limit=%d concurrency=%d", len(chunks), MAX_CHARS, admission.limit)
     if not chunks:
         raise ValueError("No speakable content after cleanup/splitting.")
-    print(f"ElevenLabs: {len(chunks)} chunk(s), limit={MAX_CHARS}, concurrency={CONCURRENCY}")
+    print(f"ElevenLabs: {len(chunks)} chunk(s), limit={MAX_CHARS}, concurrency={admission.limit}")
 
-    sem = asyncio.Semaphore(CONCURRENCY)
+    async def _task(i: int, t: str) -> bytes:
+        try:
+            audio = await tts_request_adaptive(t, admission)
+            logger.debug("eleven: chunk%d ok bytes=%d", i, len(audio))
+            return audio
+        except Exception as e:
+            logger.error("eleven: chunk%d failed %s", i, e)
+            raise
 
-    async def _task(i: int, t: str):
-        async with sem:
-            try:
-                audio = await tts_request(t)  # <-- no client arg now
-                logger.debug("eleven: chunk%d ok bytes=%d", i, len(audio))
-                return i, audio
-            except Exception as e:
-                logger.error("eleven: chunk%d failed %s", i, e)
-                raise
+    return [asyncio.create_task(_task(i, t)) for i, t in enumerate(chunks)]
 
-    # No httpx client needed anymore
-    tasks = [asyncio.create_task(_task(i, t)) for i, t in enumerate(chunks)]
-    results = await asyncio.gather(*tasks)
 
-    # restore order by index
-    results.sort(key=lambda x: x[0])
-    mp3_bytes_list = [b for _, b in results]
+async def synthesize_mp3(text: str) -> bytes:
+    """
+    Chunk text (smart), TTS concurrently, concat once.
+    Returns the MP3 bytes.
+    """
+    tasks = _start_chunk_tasks(text)
 
-    # concat once with pydub – still using BytesIO blobs
-    combined = AudioSegment.empty()
-    for blob in mp3_bytes_list:
-        combined += AudioSegment.from_file(BytesIO(blob), format="mp3")
+    # Common case (short text / one PDF page): one call, its bytes are the file
+    if len(tasks) == 1:
+        return await tasks[0]
+
+    try:
+        # gather returns results in submission order, i.e. chunk order
+        mp3_bytes_list = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # frame-level concat: no decode / re-encode round-trip through ffmpeg
+    return join_mp3(mp3_bytes_list)
+
+
+async def text_to_audio_eleven(text: str, out_path: Optional[str] = None) -> str:
+    """
+    Synthesize text and write the MP3.
+    Chunks are appended to the file in order as soon as they (and every
+    chunk before them) are ready, so the whole file is never held in memory.
+    Returns the output file path.
+    """
+    tasks = _start_chunk_tasks(text)
 
     if not out_path:
-        filename = f"{uuid.uuid4().hex}.mp3"
+        filename = f"{secrets.token_hex(8)}.mp3"
         out_path = str(AUDIO_DIR / filename)
 
-    combined.export(out_path, format="mp3")
+    # Written under a temp name and renamed at the end: callers treat an
+    # existing out_path as finished audio, so it must never be partial
+    tmp_path = f"{out_path}.{secrets.token_hex(8)}.part"
+    # file I/O goes through worker threads so a slow disk never stalls the loop
+    try:
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            for i, task in enumerate(tasks):
+                audio = await task
+                # frame-level concat, dropping the ID3 tag of later chunks
+                await asyncio.to_thread(f.write, memoryview(audio)[_id3_size(audio) if i else 0:])
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp_path, out_path)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        try:
+            await asyncio.to_thread(os.remove, tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
     print(f"Final audio => {out_path}")
     return out_path
 
 
+# ==== PDF TEXT ====
+# Pages of a PDF → audio job go through a bounded queue: one producer
+# extracts pages (in a worker thread, one page at a time) while up to
+# CONCURRENCY consumers send already-extracted pages to ElevenLabs.
+_PDF_QUEUE_SIZE = 4
+
+
+def _iter_pdf_pages(pdf_bytes: bytes) -> Iterator[Tuple[int, str]]:
+    """
+    (page index, cleaned text) for every page that has text, lazily.
+    PyMuPDF when installed, pure-Python pypdf otherwise. Blocking.
+    """
+    if fitz is not None:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            for i, page in enumerate(doc):
+                txt = cleanup_text(page.get_text("text"))
+                if txt:
+                    yield i, txt
+    else:
+        for i, page in enumerate(PdfReader(BytesIO(pdf_bytes)).pages):
+            txt = cleanup_text(page.extract_text() or "")
+            if txt:
+                yield i, txt
+
+
 # Optional: PDF → Audio utility (if you still want it)
 async def pdf_to_audio_file(pdf_bytes: bytes, merge: bool = True) -> dict:
     """
@@ -213,90 +544,91 @@ async def pdf_to_audio_file(pdf_bytes: bytes, merge: bool = True) -> dict:
     This is logic-only; you can wrap it in a FastAPI endpoint in main.py.
     """
     t0 = monotonic()
-    req_id = uuid.uuid4().hex[:8]
+    req_id = secrets.token_hex(4)
     logger.info("pdf-to-audio[%s]: starting", req_id)
 
-    # Persist upload to a temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        pdf_path = tmp.name
-        tmp.write(pdf_bytes)
-
-    # Read & extract text
-    try:
-        reader = PyPDF2.PdfReader(pdf_path)
-        pages: List[Tuple[int, str]] = []
-        for i, page in enumerate(reader.pages):
-            txt = cleanup_text(page.extract_text() or "")
-            if txt:
-                pages.append((i, txt))
-        logger.info("pdf-to-audio[%s]: extracted text pages=%d", req_id, len(pages))
-    finally:
-        try:
-            os.remove(pdf_path)
-        except Exception:
-            logger.warning("pdf-to-audio[%s]: could not remove temp pdf", req_id)
-
-    if not pages:
-        return {"error": "No text could be extracted from the PDF."}
-
-    base_id = uuid.uuid4().hex
+    base_id = secrets.token_hex(8)
     file_paths: List[str] = []
-    audio_segments: List[AudioSegment] = []
 
-    async def render_one(idx: int, text: str) -> Tuple[int, str]:
+    async def render_one(idx: int, text: str) -> Tuple[str, bytes]:
         out_filename = f"{base_id}_page{idx+1}.mp3"
         out_full_path = AUDIO_DIR / out_filename
         ts = monotonic()
         logger.info("pdf-to-audio[%s]: TTS start page=%d", req_id, idx + 1)
-        await text_to_audio_eleven(text, str(out_full_path))
+        audio = await synthesize_mp3(text)
+        await asyncio.to_thread(out_full_path.write_bytes, audio)
         logger.info(
             "pdf-to-audio[%s]: TTS ok page=%d ms=%d out=%s",
             req_id, idx + 1, int((monotonic() - ts) * 1000), out_full_path
         )
-        return idx, str(out_full_path)
+        # keep the bytes so the merge doesn't read the page back from disk
+        return str(out_full_path), audio
+
+    # bounded: extraction pauses while the consumers are busy (backpressure)
+    queue: "asyncio.Queue[Optional[Tuple[int, str]]]" = asyncio.Queue(maxsize=_PDF_QUEUE_SIZE)
+    n_workers = max(1, CONCURRENCY)
+    extracted = 0
+    failed_count = 0
+    done: Dict[int, Tuple[str, bytes]] = {}
+
+    async def produce() -> None:
+        nonlocal extracted
+        pages = _iter_pdf_pages(pdf_bytes)
+        # the generator runs in a worker thread, but never in two at once
+        while (item := await asyncio.to_thread(next, pages, None)) is not None:
+            extracted += 1
+            await queue.put(item)
+        for _ in range(n_workers):
+            await queue.put(None)
+        logger.info("pdf-to-audio[%s]: extracted text pages=%d", req_id, extracted)
+
+    async def consume() -> None:
+        nonlocal failed_count
+        while (item := await queue.get()) is not None:
+            idx, text = item
+            try:
+                done[idx] = await render_one(idx, text)
+            except Exception as e:
+                failed_count += 1
+                logger.exception("pdf-to-audio[%s]: TTS page failed", req_id, exc_info=e)
 
     t_tts = monotonic()
-    tasks = [render_one(i, t) for i, t in pages]
-    gathered = await asyncio.gather(*tasks, return_exceptions=True)
+    consumers = [asyncio.create_task(consume()) for _ in range(n_workers)]
+    try:
+        await produce()
+        await asyncio.gather(*consumers)
+    finally:
+        # extraction failed or we were cancelled: don't leave consumers waiting
+        for task in consumers:
+            task.cancel()
     logger.info(
         "pdf-to-audio[%s]: TTS total ms=%d",
         req_id, int((monotonic() - t_tts) * 1000)
     )
 
-    ok_results: List[Tuple[int, str]] = []
-    failed_count = 0
-    for r in gathered:
-        if isinstance(r, Exception):
-            failed_count += 1
-            logger.exception("pdf-to-audio[%s]: TTS page failed", req_id, exc_info=r)
-        else:
-            ok_results.append(cast(Tuple[int, str], r))
+    if not extracted:
+        return {"error": "No text could be extracted from the PDF."}
+
+    # pages finish out of order; put them back in page order
+    ok_results = [done[i] for i in sorted(done)]
 
     if not ok_results:
         return {
             "error": "TTS failed for all pages. Check server logs for details."
         }
 
-    ok_results.sort(key=lambda x: x[0])
-
-    for _, out_path in ok_results:
+    for out_path, _ in ok_results:
         file_paths.append(out_path)
-        try:
-            audio_segments.append(AudioSegment.from_file(out_path, format="mp3"))
-        except Exception as e:
-            logger.exception("pdf-to-audio[%s]: failed to read MP3", req_id)
 
-    if merge and audio_segments:
+    if merge and file_paths:
         t_merge = monotonic()
-        merged = audio_segments[0]
-        for seg in audio_segments[1:]:
-            merged += seg
         merged_name = f"{base_id}_merged.mp3"
         merged_path = AUDIO_DIR / merged_name
-        merged.export(merged_path, format="mp3")
+        merged = join_mp3([audio for _, audio in ok_results])
+        await asyncio.to_thread(merged_path.write_bytes, merged)
         logger.info(
             "pdf-to-audio[%s]: merged parts=%d ms=%d -> %s",
-            req_id, len(audio_segments), int((monotonic() - t_merge) * 1000), merged_path
+            req_id, len(ok_results), int((monotonic() - t_merge) * 1000), merged_path
         )
         logger.info(
             "pdf-to-audio[%s]: DONE mode=merged total_ms=%d",
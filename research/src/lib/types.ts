@@ -47,6 +47,7 @@ export interface TagIn {
 export interface PromptBuilderRequest {
     tags: TagIn[];
     pattern_names: string[];
+    num_candidates?: number;
 }
 
 export interface PromptBuilderResponse {